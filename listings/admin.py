@@ -6,6 +6,10 @@ from django.http import HttpResponse
 import csv
 
 
+from . import clustering
+from .caching import HOME_CONTENT, LISTING_CONTENT, bump_content_version
+from .lead_stats import invalidate_lead_stats
+from .templatetags.listing_images import rendition_url
 from .models import (
     Listing,
     ListingImage,
@@ -20,7 +24,12 @@ from .models import (
     FAQ,
     Page,
     PropertyInterest,
+    InterestNote,
     Review,
+    ReviewStats,
+    ImageRendition,
+    GeocodeCache,
+    NearbyPlacesCache,
 )
 
 # ----------------------
@@ -58,10 +67,24 @@ class ListingImageInline(admin.TabularInline):
 
     def preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="height:64px;border-radius:4px;"/>', obj.image.url)
+            return format_html('<img src="{}" style="height:64px;border-radius:4px;"/>', rendition_url(obj.image.name))
         return "-"
     preview.short_description = 'Preview'
 
+
+class InterestNoteInline(admin.TabularInline):
+    model = InterestNote
+    extra = 1
+    fields = ('created_at', 'author', 'body')
+    readonly_fields = ('created_at', 'author')
+
+    # Notes are append-only
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 # ----------------------
 # Listing Admin
 # ----------------------
@@ -80,9 +103,9 @@ class ListingAdmin(admin.ModelAdmin):
     list_per_page = 25
 
     def main_image_preview(self, obj):
-        url = obj.get_first_image()
-        if url:
-            return format_html('<img src="{}" style="height:80px; border-radius:6px;"/>', url)
+        name = obj.get_first_image_name()
+        if name:
+            return format_html('<img src="{}" style="height:80px; border-radius:6px;"/>', rendition_url(name))
         return "-"
     main_image_preview.short_description = 'Image'
 
@@ -93,14 +116,28 @@ class ListingAdmin(admin.ModelAdmin):
     # Simple bulk actions
     def mark_active(self, request, queryset):
         updated = queryset.update(status='active')
+        # update() skips post_save, so invalidate the home page and map here
+        bump_content_version(HOME_CONTENT)
+        bump_content_version(LISTING_CONTENT)
+        clustering.invalidate_all()
         self.message_user(request, f"{updated} listing(s) marked as active.")
     mark_active.short_description = 'Mark selected listings as Active'
 
     def mark_sold(self, request, queryset):
         updated = queryset.update(status='sold')
+        bump_content_version(HOME_CONTENT)
+        bump_content_version(LISTING_CONTENT)
+        clustering.invalidate_all()
         self.message_user(request, f"{updated} listing(s) marked as Sold.")
     mark_sold.short_description = 'Mark selected listings as Sold'
 
+@admin.register(ImageRendition)
+class ImageRenditionAdmin(admin.ModelAdmin):
+    list_display = ('source_name', 'size', 'format', 'width', 'height', 'file_size', 'created_at')
+    list_filter = ('size', 'format')
+    search_fields = ('source_name',)
+    readonly_fields = ('created_at',)
+
 # ----------------------
 # AgentProfile Admin
 # ----------------------
@@ -201,6 +238,19 @@ class PageAdmin(admin.ModelAdmin):
         return '-'
     header_preview.short_description = 'Header'
 
+@admin.register(GeocodeCache)
+class GeocodeCacheAdmin(admin.ModelAdmin):
+    list_display = ('address', 'status', 'latitude', 'longitude', 'fetched_at')
+    list_filter = ('status',)
+    search_fields = ('address',)
+    readonly_fields = ('address_hash', 'fetched_at')
+
+@admin.register(NearbyPlacesCache)
+class NearbyPlacesCacheAdmin(admin.ModelAdmin):
+    list_display = ('cell_key', 'place_type', 'keyword', 'fetched_at')
+    list_filter = ('place_type',)
+    search_fields = ('cell_key',)
+
 # ----------------------
 # Contact & BuyerPreference Admins
 # ----------------------
@@ -230,6 +280,7 @@ class PropertyInterestAdmin(admin.ModelAdmin):
     list_filter = ['interest_type', 'property_type', 'status', 'created_at']
     search_fields = ['name', 'email', 'phone']
     readonly_fields = ['created_at']
+    inlines = (InterestNoteInline,)
     
     fieldsets = (
         ('Contact Info', {
@@ -247,7 +298,7 @@ class PropertyInterestAdmin(admin.ModelAdmin):
             'classes': ('collapse',),
         }),
         ('Management', {
-            'fields': ('status', 'priority', 'notes', 'assigned_to', 'follow_up_date')
+            'fields': ('status', 'priority', 'assigned_to', 'follow_up_date')
         }),
     )
     
@@ -267,6 +318,23 @@ class PropertyInterestAdmin(admin.ModelAdmin):
     created_at_short.short_description = 'Created'
     created_at_short.admin_order_field = 'created_at'
     
+    # Lead deletes send no signal (see listings/signals.py)
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_lead_stats()
+    
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        invalidate_lead_stats()
+    
+    def save_formset(self, request, form, formset, change):
+        if formset.model is InterestNote:
+            for note in formset.save(commit=False):
+                note.author = note.author or request.user
+                note.save()
+        else:
+            super().save_formset(request, form, formset, change)
+    
     ordering = ['-created_at']
 
 # listings/admin.py
@@ -297,20 +365,40 @@ class ReviewAdmin(admin.ModelAdmin):
     actions = ['approve_reviews', 'feature_reviews', 'unfeature_reviews']
     
     def approve_reviews(self, request, queryset):
-        queryset.update(is_approved=True)
-        self.message_user(request, f"{queryset.count()} reviews approved.")
+        updated = ReviewStats.update_reviews(queryset, is_approved=True)
+        bump_content_version(HOME_CONTENT)
+        self.message_user(request, f"{updated} reviews approved.")
     approve_reviews.short_description = "Approve selected reviews"
     
     def feature_reviews(self, request, queryset):
-        queryset.update(featured=True)
-        self.message_user(request, f"{queryset.count()} reviews featured.")
+        updated = ReviewStats.update_reviews(queryset, featured=True)
+        bump_content_version(HOME_CONTENT)
+        self.message_user(request, f"{updated} reviews featured.")
     feature_reviews.short_description = "Feature selected reviews"
     
     def unfeature_reviews(self, request, queryset):
-        queryset.update(featured=False)
-        self.message_user(request, f"{queryset.count()} reviews unfeatured.")
+        updated = ReviewStats.update_reviews(queryset, featured=False)
+        bump_content_version(HOME_CONTENT)
+        self.message_user(request, f"{updated} reviews unfeatured.")
     unfeature_reviews.short_description = "Remove from featured"
 
+@admin.register(ReviewStats)
+class ReviewStatsAdmin(admin.ModelAdmin):
+    list_display = ('total_count', 'approved_count', 'featured_count', 'rating_sum', 'updated_at')
+    readonly_fields = (
+        'total_count', 'approved_count', 'featured_count', 'featured_total_count',
+        'rating_sum', 'rating_histogram', 'category_counts', 'updated_at',
+    )
+    actions = ['rebuild_stats']
+
+    def has_add_permission(self, request):
+        return False
+
+    def rebuild_stats(self, request, queryset):
+        ReviewStats.rebuild()
+        self.message_user(request, "Review statistics rebuilt.")
+    rebuild_stats.short_description = "Rebuild from reviews"
+
 # Admin site branding
 # ----------------------
 admin.site.site_header = 'Veterans Realty Admin'
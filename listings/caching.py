@@ -0,0 +1,71 @@
+# listings/caching.py
+"""
+Versioned cache helpers.
+
+Cached data is keyed on a "content version" number kept in the cache
+itself. Signal handlers bump the version whenever the underlying models
+change, so stale entries are simply never looked up again and expire on
+their own.
+"""
+import time
+
+from django.core.cache import cache
+
+HOME_CONTENT = 'home'
+# Bumped on every Listing write; search facets/results are keyed on it
+LISTING_CONTENT = 'listings'
+# Bumped on every PropertyInterest write; lead dashboard counters
+LEAD_CONTENT = 'leads'
+
+
+def _version_key(namespace):
+    return f'listings:version:{namespace}'
+
+
+def _seed_version():
+    # Bumps add 1, so a version key that gets evicted and re-seeded would
+    # collide with an old version if bumps ever outran the seed's clock;
+    # nanoseconds are never outrun
+    return time.time_ns()
+
+
+def get_content_version(namespace=HOME_CONTENT):
+    """Return the current version number for a cache namespace"""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted or flushed version never
+        # comes back as a number that was already used
+        cache.add(key, _seed_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_content_version(namespace=HOME_CONTENT):
+    """Invalidate everything cached under a namespace"""
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _seed_version()
+        cache.set(key, version, None)
+        return version
+
+
+def versioned_key(namespace, *parts):
+    """Build a cache key tied to the current version of a namespace"""
+    version = get_content_version(namespace)
+    suffix = ':'.join(str(part) for part in parts)
+    return f'listings:{namespace}:v{version}:{suffix}'
+
+
+def get_or_build(namespace, name, builder, timeout=None):
+    """Fetch a versioned cache entry, building and storing it on a miss"""
+    if timeout is None:
+        timeout = cache.default_timeout
+    key = versioned_key(namespace, name)
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout)
+    return value
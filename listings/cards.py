@@ -0,0 +1,120 @@
+# listings/cards.py
+"""
+Read path for listing cards (home page grid, search results).
+
+A card needs a dozen short columns, not the whole Listing row: in
+particular not the unbounded description, of which it shows 20 words.
+card_queryset() selects a fixed column set plus a SQL-side prefix of the
+description, and ListingCard holds one row in __slots__ with the display
+strings computed once instead of on every template access.
+"""
+from django.core.files.storage import default_storage
+from django.db.models.functions import Left
+from django.template.defaultfilters import floatformat, pluralize
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+CARD_COLUMNS = (
+    'id', 'title', 'price', 'address', 'city', 'state', 'zip_code',
+    'beds', 'baths', 'sq_ft', 'featured', 'main_image', 'cover_image',
+    'latitude', 'longitude',
+)
+EXCERPT_WORDS = 20
+# Plenty for 20 words; the rest of the description never leaves the database
+EXCERPT_CHARS = 400
+
+
+def highlight_html(headline):
+    """
+    A full-text search snippet as safe HTML: the listing text is escaped,
+    only the <mark> highlights added by ts_headline are kept
+    """
+    return mark_safe(
+        escape(headline)
+        .replace(escape('<mark>'), '<mark>')
+        .replace(escape('</mark>'), '</mark>')
+    )
+
+
+class ListingCard:
+    __slots__ = (
+        'id', 'title', 'price', 'address', 'city', 'state', 'zip_code',
+        'beds', 'baths', 'sq_ft', 'featured', 'image_name', 'latitude', 'longitude',
+        'excerpt', 'price_display', 'location_display', 'beds_display',
+        'baths_display', 'headline', 'headline_html', 'distance_km', 'distance_mi',
+    )
+
+    def __init__(self, row):
+        self.id = row['id']
+        self.title = row['title']
+        self.price = row['price']
+        self.address = row['address']
+        self.city = row['city']
+        self.state = row['state']
+        self.zip_code = row['zip_code']
+        self.beds = row['beds']
+        self.baths = row['baths']
+        self.sq_ft = row['sq_ft']
+        self.featured = row['featured']
+        self.image_name = row['main_image'] or row['cover_image'] or None
+        self.latitude = row['latitude']
+        self.longitude = row['longitude']
+        # Same output as the template's |truncatewords:20
+        self.excerpt = Truncator(row['excerpt'] or '').words(EXCERPT_WORDS, truncate=' …')
+        self.headline = row.get('headline')
+        self.headline_html = highlight_html(self.headline) if self.headline else None
+        self.distance_km = self.distance_mi = None
+
+        self.price_display = f"${floatformat(self.price, 0)}"
+        self.location_display = f"{self.address}, {self.city}, {self.state}"
+        self.beds_display = f"{self.beds} Bed{pluralize(self.beds)}"
+        self.baths_display = f"{self.baths} Bath{pluralize(self.baths)}"
+
+    @classmethod
+    def from_instance(cls, listing):
+        """Card for a Listing loaded through card_model_queryset()"""
+        row = {name: getattr(listing, name) for name in CARD_COLUMNS}
+        row['main_image'] = listing.main_image.name
+        row['excerpt'] = getattr(listing, 'excerpt', None)
+        return cls(row)
+
+    def __repr__(self):
+        return f"<ListingCard {self.id}: {self.title}>"
+
+    @property
+    def pk(self):
+        return self.id
+
+    def get_first_image_name(self):
+        return self.image_name
+
+    def get_first_image(self):
+        return default_storage.url(self.image_name) if self.image_name else None
+
+
+def card_queryset(queryset):
+    """Narrow a Listing queryset to the card columns (as dicts)"""
+    columns = list(CARD_COLUMNS)
+    if 'headline' in queryset.query.annotations:
+        # Full-text search snippet (listings/search.py)
+        columns.append('headline')
+    return queryset.values(*columns, excerpt=Left('description', EXCERPT_CHARS))
+
+
+def card_model_queryset(queryset):
+    """
+    The same columns as model instances, for code that needs instances
+    (e.g. CursorPaginator); convert with ListingCard.from_instance()
+    """
+    return queryset.only(*CARD_COLUMNS, 'created_at').annotate(
+        excerpt=Left('description', EXCERPT_CHARS)
+    )
+
+
+def get_cards(queryset, limit=None):
+    """Evaluate a Listing queryset as a list of ListingCards"""
+    rows = card_queryset(queryset)
+    if limit is not None:
+        rows = rows[:limit]
+    return [ListingCard(row) for row in rows]
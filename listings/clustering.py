@@ -0,0 +1,160 @@
+# listings/clustering.py
+"""
+Server-side marker clustering for the listings map.
+
+The map asks for the Web Mercator tiles covering its viewport at the
+current zoom. Each tile is split into a CLUSTER_GRID x CLUSTER_GRID grid
+and the active listings in it are aggregated per grid cell with NumPy
+(count, centroid, min/max price). Tiles are cached individually under a
+per-tile version, so editing a listing only invalidates the tiles (one per
+zoom level) that contain it. Bulk writes that bypass signals bump the
+global CLUSTERS version instead.
+
+NumPy is imported only when a tile is built: this module is loaded at
+startup (signals, admin) and invalidation is pure Python.
+"""
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .caching import bump_content_version, get_content_version, versioned_key
+from .models import Listing
+
+CLUSTERS = 'clusters'
+CLUSTER_GRID = 8
+MAX_ZOOM = 20
+MAX_TILES = 64
+MAX_LATITUDE = 85.05112878  # Web Mercator cutoff
+
+
+def tile_for(lat, lng, zoom):
+    """(x, y) of the tile containing a point"""
+    n = 2 ** zoom
+    lat = min(max(lat, -MAX_LATITUDE), MAX_LATITUDE)
+    x = int((lng + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(zoom, x, y):
+    """(south, west, north, east) of a tile"""
+    n = 2 ** zoom
+    west = x / n * 360 - 180
+    east = (x + 1) / n * 360 - 180
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+def tiles_for_bbox(bbox, zoom, max_tiles=None):
+    """
+    All (x, y) tiles overlapping a (south, west, north, east) box. Raises
+    ValueError, before building the list, if there are more than max_tiles.
+    """
+    south, west, north, east = bbox
+    x0, y0 = tile_for(north, west, zoom)
+    x1, y1 = tile_for(south, east, zoom)
+    if max_tiles is not None and max(x1 - x0 + 1, 0) * max(y1 - y0 + 1, 0) > max_tiles:
+        raise ValueError("Viewport covers too many tiles for this zoom level")
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def _tile_namespace(zoom, x, y):
+    return f'tile:{zoom}:{x}:{y}'
+
+
+def build_tile(zoom, x, y):
+    """Cluster the active listings inside one tile"""
+    import numpy as np
+
+    south, west, north, east = tile_bounds(zoom, x, y)
+    rows = list(
+        Listing.objects.filter(
+            status='active',
+            latitude__range=(south, north),
+            longitude__range=(west, east),
+        ).values_list('pk', 'latitude', 'longitude', 'price')
+    )
+    if not rows:
+        return []
+
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    lats = np.array([row[1] for row in rows], dtype=np.float64)
+    lngs = np.array([row[2] for row in rows], dtype=np.float64)
+    prices = np.array([float(row[3]) for row in rows], dtype=np.float64)
+
+    # Position inside the tile in grid cells, using the same projection as
+    # tile_for so points on a tile edge land in exactly one tile
+    n = 2 ** zoom
+    clamped = np.radians(np.clip(lats, -MAX_LATITUDE, MAX_LATITUDE))
+    fx = ((lngs + 180) / 360 * n - x) * CLUSTER_GRID
+    fy = ((1 - np.arcsinh(np.tan(clamped)) / np.pi) / 2 * n - y) * CLUSTER_GRID
+    inside = (fx >= 0) & (fx < CLUSTER_GRID) & (fy >= 0) & (fy < CLUSTER_GRID)
+    if not inside.any():
+        return []
+    ids, lats, lngs, prices = ids[inside], lats[inside], lngs[inside], prices[inside]
+    cells = fy[inside].astype(np.int64) * CLUSTER_GRID + fx[inside].astype(np.int64)
+
+    size = CLUSTER_GRID * CLUSTER_GRID
+    counts = np.bincount(cells, minlength=size)
+    lat_sums = np.bincount(cells, weights=lats, minlength=size)
+    lng_sums = np.bincount(cells, weights=lngs, minlength=size)
+    min_prices = np.full(size, np.inf)
+    max_prices = np.full(size, -np.inf)
+    np.minimum.at(min_prices, cells, prices)
+    np.maximum.at(max_prices, cells, prices)
+    first_ids = np.zeros(size, dtype=np.int64)
+    np.maximum.at(first_ids, cells, ids)
+
+    clusters = []
+    for cell in np.flatnonzero(counts):
+        count = int(counts[cell])
+        cluster = {
+            'lat': round(float(lat_sums[cell] / count), 6),
+            'lng': round(float(lng_sums[cell] / count), 6),
+            'count': count,
+            'min_price': float(min_prices[cell]),
+            'max_price': float(max_prices[cell]),
+        }
+        if count == 1:
+            cluster['id'] = int(first_ids[cell])
+        clusters.append(cluster)
+    return clusters
+
+
+def get_clusters(bbox, zoom):
+    """Clusters for every tile overlapping bbox, built or read from cache"""
+    tiles = tiles_for_bbox(bbox, zoom, max_tiles=MAX_TILES)
+
+    generation = get_content_version(CLUSTERS)
+    keys = {
+        versioned_key(_tile_namespace(zoom, x, y), generation): (x, y)
+        for x, y in tiles
+    }
+    cached = cache.get_many(list(keys))
+
+    missing = {}
+    clusters = []
+    for key, (x, y) in keys.items():
+        tile = cached.get(key)
+        if tile is None:
+            tile = build_tile(zoom, x, y)
+            missing[key] = tile
+        clusters.extend(tile)
+    if missing:
+        cache.set_many(missing, settings.CLUSTER_CACHE_TIMEOUT)
+    return clusters
+
+
+def invalidate_point(lat, lng):
+    """Drop the cached tiles, at every zoom, containing a point"""
+    if lat is None or lng is None:
+        return
+    for zoom in range(MAX_ZOOM + 1):
+        bump_content_version(_tile_namespace(zoom, *tile_for(lat, lng, zoom)))
+
+
+def invalidate_all():
+    """For bulk writes that skip signals"""
+    bump_content_version(CLUSTERS)
@@ -0,0 +1,90 @@
+# listings/facets.py
+"""
+Facet counts for the search page: results per city, bedroom count,
+bathroom count and price band.
+
+All four facets come from one query: the filtered listings are grouped by
+city, and every bed/bath/price bucket is a conditional COUNT(...) FILTER
+column on that grouping. The other facets are the column totals across
+cities. Results are cached per normalized filter signature for a short
+time and dropped whenever a listing changes (LISTING_CONTENT version).
+"""
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .caching import LISTING_CONTENT, get_or_build
+
+# (label, lower bound inclusive, upper bound exclusive)
+BED_BUCKETS = [
+    ('1', 1, 2),
+    ('2', 2, 3),
+    ('3', 3, 4),
+    ('4', 4, 5),
+    ('5+', 5, None),
+]
+BATH_BUCKETS = [
+    ('1', None, 2),
+    ('2', 2, 3),
+    ('3', 3, 4),
+    ('4+', 4, None),
+]
+PRICE_BUCKETS = [
+    ('Under $150k', None, 150000),
+    ('$150k - $250k', 150000, 250000),
+    ('$250k - $350k', 250000, 350000),
+    ('$350k - $500k', 350000, 500000),
+    ('$500k+', 500000, None),
+]
+FACETS = (
+    ('beds', 'beds', BED_BUCKETS),
+    ('baths', 'baths', BATH_BUCKETS),
+    ('price', 'price', PRICE_BUCKETS),
+)
+
+
+def _bucket_filter(field, low, high):
+    condition = Q()
+    if low is not None:
+        condition &= Q(**{f'{field}__gte': low})
+    if high is not None:
+        condition &= Q(**{f'{field}__lt': high})
+    return condition
+
+
+def compute_facets(queryset):
+    """Facet counts for a Listing queryset, in a single grouped query"""
+    aggregates = {}
+    for facet, field, buckets in FACETS:
+        for i, (label, low, high) in enumerate(buckets):
+            aggregates[f'{facet}_{i}'] = Count('pk', filter=_bucket_filter(field, low, high))
+
+    rows = list(
+        queryset.order_by().values('city').annotate(total=Count('pk'), **aggregates)
+    )
+
+    facets = {
+        'city': sorted(
+            ({'value': row['city'], 'count': row['total']} for row in rows),
+            key=lambda item: (-item['count'], item['value']),
+        ),
+    }
+    for facet, field, buckets in FACETS:
+        facets[facet] = [
+            {
+                'label': label,
+                'min': low,
+                'max': high,
+                'count': sum(row[f'{facet}_{i}'] for row in rows),
+            }
+            for i, (label, low, high) in enumerate(buckets)
+        ]
+    return facets
+
+
+def get_facets(signature, queryset):
+    """compute_facets() cached under a normalized search signature"""
+    return get_or_build(
+        LISTING_CONTENT, f'facets:{signature}',
+        lambda: compute_facets(queryset),
+        timeout=settings.SEARCH_FACET_CACHE_TIMEOUT,
+    )
@@ -7,12 +7,57 @@ class ContactForm(forms.ModelForm):
         fields = ['listing','name','email','phone','message']
         widgets = {'listing': forms.HiddenInput()}
 
+def parse_bbox(value):
+    """Parse "south,west,north,east" into a tuple of floats, or None if blank"""
+    if not value:
+        return None
+    try:
+        south, west, north, east = (float(part) for part in value.split(','))
+    except ValueError:
+        raise forms.ValidationError("Use south,west,north,east")
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        raise forms.ValidationError("Box corners are out of range")
+    return (south, west, north, east)
+
+
 class ListingSearchForm(forms.Form):
     q = forms.CharField(required=False, label='Search')
     min_price = forms.DecimalField(required=False, decimal_places=2)
     max_price = forms.DecimalField(required=False, decimal_places=2)
     beds = forms.IntegerField(required=False)
     city = forms.CharField(required=False)
+    # Geo search: a point plus radius, and/or a "south,west,north,east" box
+    lat = forms.FloatField(required=False, min_value=-90, max_value=90)
+    lng = forms.FloatField(required=False, min_value=-180, max_value=180)
+    radius_mi = forms.FloatField(required=False, min_value=0.1, max_value=100)
+    bbox = forms.CharField(required=False)
+    sort = forms.ChoiceField(required=False, choices=[('', 'Newest'), ('distance', 'Distance')])
+
+    def clean_bbox(self):
+        return parse_bbox(self.cleaned_data.get('bbox'))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        has_point = cleaned_data.get('lat') is not None and cleaned_data.get('lng') is not None
+        if (cleaned_data.get('lat') is None) != (cleaned_data.get('lng') is None):
+            raise forms.ValidationError("lat and lng go together")
+        if cleaned_data.get('radius_mi') is not None and not has_point:
+            raise forms.ValidationError("radius_mi needs lat and lng")
+        if cleaned_data.get('sort') == 'distance' and not has_point:
+            raise forms.ValidationError("Sorting by distance needs lat and lng")
+        return cleaned_data
+
+    def has_geo_filter(self):
+        data = self.cleaned_data
+        return any(data.get(name) is not None for name in ('lat', 'radius_mi', 'bbox'))
+
+
+class MapClusterForm(forms.Form):
+    bbox = forms.CharField()
+    zoom = forms.IntegerField(min_value=0, max_value=20)
+
+    def clean_bbox(self):
+        return parse_bbox(self.cleaned_data.get('bbox'))
 
 # class ContactForm1(forms.ModelForm):
 
@@ -0,0 +1,106 @@
+# listings/geo.py
+"""
+Batched great-circle distances and nearest/best-rated ranking.
+
+Everything here takes a whole array of points at once: with NumPy the
+haversine runs vectorized and top-k selection uses argpartition; without
+it the same functions fall back to plain Python loops, so callers never
+need to care which one they got.
+"""
+import heapq
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional here
+    np = None
+
+EARTH_RADIUS_KM = 6371.0
+KM_TO_MILES = 0.621371
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def bounding_box(lat, lng, radius_km):
+    """(south, west, north, east) of a box containing the circle around (lat, lng)"""
+    dlat = radius_km / KM_PER_DEGREE
+    # Degrees of longitude shrink toward the poles; size for the poleward edge
+    poleward = min(abs(lat) + dlat, 89.9)
+    dlng = radius_km / (KM_PER_DEGREE * math.cos(math.radians(poleward)))
+    return (max(lat - dlat, -90.0), lng - dlng, min(lat + dlat, 90.0), lng + dlng)
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """
+    Distances in km from (lat, lng) to each (lats[i], lngs[i]). Returns a
+    NumPy array when NumPy is installed, a list otherwise.
+    """
+    if np is not None:
+        lat1 = math.radians(lat)
+        lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+        dlat = lat2 - lat1
+        dlng = np.radians(np.asarray(lngs, dtype=np.float64)) - math.radians(lng)
+        a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    lat1 = math.radians(lat)
+    cos_lat1 = math.cos(lat1)
+    distances = []
+    for point_lat, point_lng in zip(lats, lngs):
+        lat2 = math.radians(point_lat)
+        a = (math.sin((lat2 - lat1) / 2) ** 2
+             + cos_lat1 * math.cos(lat2) * math.sin(math.radians(point_lng - lng) / 2) ** 2)
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return distances
+
+
+def rank(distances, ratings=None, limit=None, max_km=None):
+    """
+    Indexes into `distances` ordered nearest first, or by rating (highest
+    first, missing = 0) then distance when `ratings` is given. Points past
+    `max_km` are dropped and at most `limit` indexes are returned.
+    """
+    if np is not None:
+        distances = np.asarray(distances, dtype=np.float64)
+        candidates = np.arange(len(distances))
+        if max_km is not None:
+            candidates = candidates[distances <= max_km]
+        if ratings is not None:
+            ratings = np.nan_to_num(np.asarray(ratings, dtype=np.float64)[candidates], nan=0.0)
+            order = candidates[np.lexsort((distances[candidates], -ratings))]
+            return order[:limit].tolist()
+        if limit is not None and limit < len(candidates):
+            # Only the k nearest need sorting
+            candidates = candidates[np.argpartition(distances[candidates], limit)[:limit]]
+        return candidates[np.argsort(distances[candidates], kind='stable')].tolist()
+
+    candidates = [i for i, d in enumerate(distances) if max_km is None or d <= max_km]
+    if ratings is not None:
+        key = lambda i: (-(ratings[i] or 0), distances[i])
+    else:
+        key = lambda i: distances[i]
+    if limit is not None:
+        return heapq.nsmallest(limit, candidates, key=key)
+    return sorted(candidates, key=key)
+
+
+def rank_places(lat, lng, places, by_rating=False, limit=None, max_km=None):
+    """
+    Annotate Places-API-shaped dicts with distance_km / distance_miles from
+    (lat, lng) and return them nearest first (or best rated first).
+    """
+    if not places:
+        return []
+    locations = [place['geometry']['location'] for place in places]
+    distances = haversine_km(lat, lng,
+                             [loc['lat'] for loc in locations],
+                             [loc['lng'] for loc in locations])
+    ratings = [place.get('rating') for place in places] if by_rating else None
+
+    ranked = []
+    for i in rank(distances, ratings=ratings, limit=limit, max_km=max_km):
+        distance = float(distances[i])
+        place = places[i]
+        place['distance_km'] = round(distance, 2)
+        place['distance_miles'] = round(distance * KM_TO_MILES, 2)
+        ranked.append(place)
+    return ranked
@@ -0,0 +1,138 @@
+# listings/geocoding.py
+"""
+Address geocoding with two cache layers in front of the Google API.
+
+Lookups go: in-process LRU -> GeocodeCache table -> Geocoding API.
+Successful results are trusted for GEOCODE_CACHE_TTL, failures for the
+much shorter GEOCODE_NEGATIVE_TTL. When a stale success can't be
+refreshed we keep serving it rather than dropping the map.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .google_client import GoogleApiError, google_client
+from .models import GeocodeCache
+
+logger = logging.getLogger(__name__)
+
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def normalize_address(address):
+    """Canonical form of an address so trivial variations share a cache entry"""
+    address = (address or '').lower()
+    address = re.sub(r'[^\w\s#-]', ' ', address)
+    return ' '.join(address.split())
+
+
+def address_hash(address):
+    return hashlib.sha256(normalize_address(address).encode('utf-8')).hexdigest()
+
+
+def _is_fresh(status, fetched_at):
+    ttl = settings.GEOCODE_CACHE_TTL if status == GeocodeCache.STATUS_OK else settings.GEOCODE_NEGATIVE_TTL
+    return timezone.now() - fetched_at < timedelta(seconds=ttl)
+
+
+def _lru_get(key):
+    with _lru_lock:
+        entry = _lru.get(key)
+        if entry is not None:
+            _lru.move_to_end(key)
+        return entry
+
+
+def _lru_put(key, entry):
+    with _lru_lock:
+        _lru[key] = entry
+        _lru.move_to_end(key)
+        while len(_lru) > settings.GEOCODE_LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+class RateLimiter:
+    """Spaces calls at least 1/qps seconds apart across threads"""
+
+    def __init__(self, qps, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1.0 / qps if qps > 0 else 0
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self.sleep(slot - now)
+
+
+def fetch_coordinates(address):
+    """Call the Geocoding API; returns (status, lat, lng)"""
+    try:
+        data = google_client.get_json("geocode/json", {"address": address})
+    except GoogleApiError as e:
+        logger.warning("Geocoding failed for %r: %s", address, e)
+        return GeocodeCache.STATUS_ERROR, None, None
+
+    if data['status'] == 'OK' and data['results']:
+        loc = data['results'][0]['geometry']['location']
+        return GeocodeCache.STATUS_OK, loc['lat'], loc['lng']
+
+    logger.warning("Geocoding error for %r: %s %s", address, data['status'],
+                   data.get('error_message', ''))
+    return data['status'], None, None
+
+
+def get_coordinates(address, rate_limiter=None):
+    """
+    Get (lat, lng) for an address, or (None, None) if it can't be found.
+    `rate_limiter` throttles calls that actually reach the API.
+    """
+    key = address_hash(address)
+
+    entry = _lru_get(key)
+    if entry is None:
+        row = GeocodeCache.objects.filter(address_hash=key).first()
+        if row is not None:
+            entry = (row.status, row.latitude, row.longitude, row.fetched_at)
+
+    if entry is not None and _is_fresh(entry[0], entry[3]):
+        _lru_put(key, entry)
+        return entry[1], entry[2]
+
+    if rate_limiter is not None:
+        rate_limiter.wait()
+    status, lat, lng = fetch_coordinates(address)
+    if status != GeocodeCache.STATUS_OK and entry is not None and entry[0] == GeocodeCache.STATUS_OK:
+        # Refresh failed; a stale answer beats none. Retry after the negative TTL.
+        status, lat, lng = entry[0], entry[1], entry[2]
+        fetched_at = timezone.now() - timedelta(
+            seconds=settings.GEOCODE_CACHE_TTL - settings.GEOCODE_NEGATIVE_TTL
+        )
+    else:
+        fetched_at = timezone.now()
+
+    GeocodeCache.objects.update_or_create(
+        address_hash=key,
+        defaults={
+            'address': normalize_address(address)[:255],
+            'latitude': lat,
+            'longitude': lng,
+            'status': status[:30],
+            'fetched_at': fetched_at,
+        },
+    )
+    _lru_put(key, (status, lat, lng, fetched_at))
+    return lat, lng
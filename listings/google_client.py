@@ -0,0 +1,195 @@
+# listings/google_client.py
+"""
+Shared HTTP client for the Google Maps web services.
+
+One requests.Session per process keeps TLS connections to Google alive
+between calls. Transient failures (5xx, OVER_QUERY_LIMIT, UNKNOWN_ERROR)
+are retried with exponential backoff, and a circuit breaker stops calling
+Google for a while after repeated failures so detail pages fail fast
+instead of waiting out every timeout.
+
+Point GOOGLE_MAPS_API_BASE_URL at a local stub server to exercise it
+without touching the real API; under override_settings the shared client
+follows the change.
+"""
+import logging
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# API statuses worth retrying; they also count against the breaker
+RETRY_STATUSES = {'OVER_QUERY_LIMIT', 'UNKNOWN_ERROR'}
+
+
+def redact_urls(message):
+    """Drop query strings (they carry the API key) from an error message"""
+    return re.sub(r'\?\S*', '', message)
+
+
+class GoogleApiError(Exception):
+    """The request failed after retries"""
+
+
+class CircuitOpenError(GoogleApiError):
+    """The breaker is open, so the request was not attempted"""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds, then lets a single trial call through
+    (half-open) to decide whether to close again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self.total_failures = 0
+        self.total_rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self):
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.total_rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Google API circuit closed")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.total_failures += 1
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            if (self._state == self.HALF_OPEN
+                    or self._consecutive_failures >= self.failure_threshold):
+                if self._state != self.OPEN:
+                    logger.warning("Google API circuit opened after %d failures",
+                                   self._consecutive_failures)
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+
+    def metrics(self):
+        """Snapshot for dashboards and health checks"""
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'consecutive_failures': self._consecutive_failures,
+                'total_failures': self.total_failures,
+                'total_rejected': self.total_rejected,
+            }
+
+
+class GoogleApiClient:
+    def __init__(self, base_url, api_key, pool_size=10, max_retries=2,
+                 backoff_factor=0.3, breaker=None):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.breaker = breaker or CircuitBreaker()
+
+        # HTTP-level retries for connection errors and 5xx responses
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get_json(self, path, params, timeout=10):
+        """
+        GET a Maps web service endpoint (e.g. 'geocode/json') and return the
+        decoded body. Raises CircuitOpenError without calling out when the
+        breaker is open, and GoogleApiError when the call fails.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"Google API circuit is open; skipped {path}")
+
+        params = dict(params, key=self.api_key)
+        url = f"{self.base_url}/{path}"
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+                response.raise_for_status()
+                data = response.json()
+            except (requests.RequestException, ValueError) as e:
+                # The adapter has already retried transport errors and 5xx.
+                # requests puts the full URL, key included, in its messages,
+                # so neither the text nor the chained exception can be kept
+                self.breaker.record_failure()
+                raise GoogleApiError(f"{path}: {redact_urls(str(e))}") from None
+
+            if data.get('status') not in RETRY_STATUSES:
+                self.breaker.record_success()
+                return data
+
+            if attempt >= self.max_retries:
+                self.breaker.record_failure()
+                raise GoogleApiError(f"{path}: {data['status']}")
+            time.sleep(self.backoff_factor * (2 ** attempt))
+            attempt += 1
+
+
+google_client = GoogleApiClient(
+    base_url=settings.GOOGLE_MAPS_API_BASE_URL,
+    api_key=settings.GOOGLE_MAPS_API_KEY,
+    pool_size=settings.GOOGLE_API_POOL_SIZE,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.GOOGLE_API_BREAKER_THRESHOLD,
+        reset_timeout=settings.GOOGLE_API_BREAKER_RESET,
+    ),
+)
+
+
+@receiver(setting_changed)
+def update_google_client(setting, value, **kwargs):
+    if setting == 'GOOGLE_MAPS_API_BASE_URL':
+        google_client.base_url = value.rstrip('/')
+    elif setting == 'GOOGLE_MAPS_API_KEY':
+        google_client.api_key = value
@@ -0,0 +1,271 @@
+# listings/importer.py
+"""
+Streaming import of listing feeds (Mockaroo or any JSON array of objects).
+
+The feed is read in chunks and decoded one array element at a time with
+JSONDecoder.raw_decode, so memory use is bounded by the batch size rather
+than the feed size. Rows are validated against the Listing fields and
+upserted in batches with INSERT ... ON CONFLICT (api_id) DO UPDATE.
+
+Each imported listing stores a content_hash of its imported fields. The
+existing (api_id, hash) pairs are loaded in one query up front, so only
+new or changed rows are written, and listings that have dropped out of the
+feed are deactivated with a single UPDATE at the end. A re-import costs
+time proportional to what changed, not to the feed size.
+"""
+import codecs
+import hashlib
+import json
+import os
+from decimal import Decimal
+
+import requests
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .models import Listing
+
+CHUNK_SIZE = 64 * 1024
+MAX_ROW_CHARS = 1024 * 1024
+
+# Listing fields an import owns, and the feed keys accepted for each
+IMPORT_FIELDS = {
+    'title': ('title', 'name'),
+    'description': ('description',),
+    'price': ('price',),
+    'address': ('address', 'street_address'),
+    'city': ('city',),
+    'state': ('state',),
+    'zip_code': ('zip_code', 'zip', 'postal_code'),
+    'beds': ('beds', 'bedrooms'),
+    'baths': ('baths', 'bathrooms'),
+    'sq_ft': ('sq_ft', 'sqft', 'square_feet'),
+    'status': ('status',),
+    'featured': ('featured',),
+}
+API_ID_KEYS = ('api_id', 'id')
+
+
+def read_chunks(source):
+    """Yield decoded text chunks from a URL or a local file path"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    if source.startswith(('http://', 'https://')):
+        with requests.get(source, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                yield decoder.decode(chunk)
+    else:
+        with open(source, 'rb') as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+def iter_json_array(chunks):
+    """Yield the elements of a top-level JSON array as the text streams in"""
+    decoder = json.JSONDecoder()
+    buffer, pos = '', 0
+    started = expect_comma = False
+
+    def skip_whitespace(i):
+        while i < len(buffer) and buffer[i] in ' \t\r\n':
+            i += 1
+        return i
+
+    for chunk in chunks:
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        while True:
+            pos = skip_whitespace(pos)
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("Feed is not a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            if expect_comma:
+                if buffer[pos] != ',':
+                    raise ValueError(f"Expected ',' in feed, got {buffer[pos]!r}")
+                expect_comma = False
+                pos += 1
+                continue
+            try:
+                row, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element not complete yet; wait for more data
+                if len(buffer) - pos > MAX_ROW_CHARS:
+                    raise ValueError("Feed row too large or malformed")
+                break
+            if (isinstance(row, (int, float))
+                    and (end == len(buffer) or buffer[end] in '0123456789.eE+-')):
+                # A number cut off by the chunk boundary; wait for the rest
+                break
+            yield row
+            pos = end
+            expect_comma = True
+
+    raise ValueError("Feed ended before the closing ']'")
+
+
+def coerce_row(raw):
+    """
+    Validate a feed row and return (api_id, field values). Raises
+    ValidationError for rows that can't be imported.
+    """
+    if not isinstance(raw, dict):
+        raise ValidationError("Row is not an object")
+
+    api_id = next((raw[key] for key in API_ID_KEYS if raw.get(key) not in (None, '')), None)
+    if api_id is None:
+        raise ValidationError("Row has no id")
+    api_id = str(api_id).strip()[:100]
+
+    values = {}
+    for name, keys in IMPORT_FIELDS.items():
+        field = Listing._meta.get_field(name)
+        value = next((raw[key] for key in keys if key in raw), None)
+        if value is None or value == '':
+            if name == 'status':
+                value = 'active'
+            elif field.has_default():
+                value = field.get_default()
+            elif not field.null:
+                raise ValidationError(f"{name} is required")
+        if isinstance(value, str):
+            value = value.strip()
+            if name == 'status':
+                value = value.lower()
+            if field.max_length:
+                value = value[:field.max_length]
+        try:
+            values[name] = field.clean(value, None)
+        except ValidationError as e:
+            raise ValidationError(f"{name}: {'; '.join(e.messages)}")
+    return api_id, values
+
+
+def content_hash(values):
+    """Stable hash of a coerced row's imported fields"""
+    parts = []
+    for name in IMPORT_FIELDS:
+        value = values[name]
+        if isinstance(value, Decimal):
+            # 2.5 and 2.50 are the same price/baths
+            value = f"{value:.{Listing._meta.get_field(name).decimal_places}f}"
+        parts.append(value)
+    payload = json.dumps(parts, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ListingImporter:
+    """Upserts new/changed rows in batches and keeps the counts for the report"""
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.rows = self.inserted = self.updated = self.unchanged = self.skipped = 0
+        self.deactivated = 0
+        self.errors = []
+        self._batch = {}
+        self._seen = set()
+        self._hashes = None
+        self._locations = None
+
+    @property
+    def written(self):
+        return self.inserted + self.updated + self.deactivated
+
+    def load_hashes(self):
+        self._hashes = {}
+        self._locations = {}
+        rows = Listing.objects.exclude(api_id=None).values_list(
+            'api_id', 'content_hash', *Listing.LOCATION_FIELDS
+        )
+        for api_id, row_hash, *location in rows:
+            self._hashes[api_id] = row_hash
+            self._locations[api_id] = tuple(location)
+
+    def add(self, raw, row_number):
+        self.rows += 1
+        try:
+            api_id, values = coerce_row(raw)
+        except ValidationError as e:
+            self.skipped += 1
+            self.errors.append((row_number, '; '.join(e.messages)))
+            return
+        self._seen.add(api_id)
+        # Later rows win; ON CONFLICT can't touch one row twice per statement
+        self._batch[api_id] = values
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, {}
+
+        listings = []
+        moved = []
+        for api_id, values in batch.items():
+            row_hash = content_hash(values)
+            current = self._hashes.get(api_id)
+            location = tuple(values[field] for field in Listing.LOCATION_FIELDS)
+            if current is None:
+                self.inserted += 1
+            elif current == row_hash:
+                self.unchanged += 1
+                continue
+            else:
+                self.updated += 1
+                if self._locations.get(api_id) != location:
+                    moved.append(api_id)
+            self._hashes[api_id] = row_hash
+            self._locations[api_id] = location
+            listings.append(Listing(source='api', api_id=api_id, content_hash=row_hash, **values))
+
+        if listings:
+            # Coordinates are left alone here: a price change must not drop
+            # a listing off the map until the next geocode run
+            Listing.objects.bulk_create(
+                listings,
+                update_conflicts=True,
+                unique_fields=['api_id'],
+                update_fields=['source', *IMPORT_FIELDS, 'content_hash', 'updated_at'],
+            )
+        if moved:
+            # Only listings whose address changed need geocoding again
+            Listing.objects.filter(api_id__in=moved).update(latitude=None, longitude=None)
+
+    def deactivate_missing(self):
+        """Mark API listings that weren't in the feed inactive, in one UPDATE"""
+        if not self._seen:
+            # An empty or entirely invalid feed is more likely broken than real
+            return
+        missing = [api_id for api_id in self._hashes if api_id not in self._seen]
+        if not missing:
+            return
+        # Clearing the hash makes the listing rewrite (and reactivate) if it
+        # comes back unchanged; sold listings stay sold
+        self.deactivated = (
+            Listing.objects.filter(source='api', api_id__in=missing)
+            .exclude(status__in=['inactive', 'sold'])
+            .update(status='inactive', content_hash='', updated_at=timezone.now())
+        )
+
+    def run(self, rows, deactivate_missing=True):
+        self.load_hashes()
+        for row_number, raw in enumerate(rows, start=1):
+            self.add(raw, row_number)
+        self.flush()
+        if deactivate_missing:
+            self.deactivate_missing()
+
+
+def feed_label(source):
+    """Source for log output, without the query string (it carries the API key)"""
+    if source.startswith(('http://', 'https://')):
+        return source.split('?', 1)[0]
+    return os.path.abspath(source)
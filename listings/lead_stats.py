@@ -0,0 +1,42 @@
+# listings/lead_stats.py
+"""
+Counters for the lead (PropertyInterest) dashboards.
+
+Every counter is a conditional COUNT(...) FILTER column of one aggregate
+query, cached for a short time and dropped on any PropertyInterest write
+(LEAD_CONTENT version). Writes that bypass signals, such as
+QuerySet.update(), must call invalidate_lead_stats() themselves.
+"""
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .caching import LEAD_CONTENT, bump_content_version, get_or_build
+from .models import PropertyInterest
+
+LEAD_COUNTERS = {
+    'total': Q(),
+    'new': Q(status='new'),
+    'contacted': Q(status='contacted'),
+    'buyers': Q(interest_type='buyer'),
+    'sellers': Q(interest_type='seller'),
+}
+
+
+def compute_lead_stats():
+    """All lead counters in a single aggregate query"""
+    return PropertyInterest.objects.aggregate(**{
+        name: Count('pk', filter=condition) if condition else Count('pk')
+        for name, condition in LEAD_COUNTERS.items()
+    })
+
+
+def get_lead_stats():
+    """compute_lead_stats(), cached until the next lead write"""
+    return get_or_build(
+        LEAD_CONTENT, 'counters', compute_lead_stats,
+        timeout=settings.LEAD_STATS_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_lead_stats():
+    bump_content_version(LEAD_CONTENT)
@@ -0,0 +1,61 @@
+# listings/management/commands/benchmark_distances.py
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from listings import geo
+from listings.places import calculate_distance
+
+
+def _best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Compare scalar haversine + sort against listings.geo's batched ranking"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='20,200,2000,20000',
+                            help="Comma-separated numbers of points to rank")
+        parser.add_argument('--limit', type=int, default=10, help="Top-k to keep")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per case (best is reported)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        origin = (31.1171, -97.7278)  # Killeen, TX
+        limit = options['limit']
+
+        self.stdout.write(f"NumPy: {'yes' if geo.np is not None else 'no (pure-Python fallback)'}")
+        self.stdout.write(f"{'points':>8}  {'scalar ms':>10}  {'batched ms':>10}  {'speedup':>8}")
+        for size in [int(s) for s in options['sizes'].split(',')]:
+            lats = [origin[0] + rng.uniform(-0.2, 0.2) for _ in range(size)]
+            lngs = [origin[1] + rng.uniform(-0.2, 0.2) for _ in range(size)]
+            ratings = [rng.choice([None, 3.5, 4.0, 4.5, 5.0]) for _ in range(size)]
+
+            def scalar():
+                rows = [
+                    (-(ratings[i] or 0), calculate_distance(origin[0], origin[1], lats[i], lngs[i]), i)
+                    for i in range(size)
+                ]
+                rows.sort()
+                return [i for _, _, i in rows[:limit]]
+
+            def batched():
+                distances = geo.haversine_km(origin[0], origin[1], lats, lngs)
+                return geo.rank(distances, ratings=ratings, limit=limit)
+
+            if scalar() != batched():
+                self.stderr.write(f"{size}: rankings differ")
+
+            scalar_time = _best_of(scalar, options['repeat'])
+            batched_time = _best_of(batched, options['repeat'])
+            self.stdout.write(
+                f"{size:>8}  {scalar_time * 1000:>10.3f}  {batched_time * 1000:>10.3f}  "
+                f"{scalar_time / batched_time:>7.1f}x"
+            )
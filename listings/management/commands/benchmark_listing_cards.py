@@ -0,0 +1,75 @@
+# listings/management/commands/benchmark_listing_cards.py
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from listings.cards import get_cards
+from listings.models import Listing
+
+
+def _measure(func, repeat):
+    """(best seconds, peak bytes) for building the result of func()"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+class Command(BaseCommand):
+    help = "Time and memory per 1,000 listing cards: model instances vs ListingCard rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help="Cards to load")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per path (best is reported)")
+        parser.add_argument('--description-words', type=int, default=300,
+                            help="Length of the generated descriptions")
+
+    def handle(self, *args, **options):
+        count = options['count']
+        with transaction.atomic():
+            # Throwaway listings with realistic descriptions, rolled back at the end
+            description = ' '.join(['spacious'] * options['description_words'])
+            Listing.objects.bulk_create([
+                Listing(
+                    title=f"Benchmark listing {i}",
+                    description=description,
+                    price=Decimal(200000 + i),
+                    status='active',
+                )
+                for i in range(count)
+            ])
+            queryset = Listing.objects.filter(
+                title__startswith="Benchmark listing"
+            ).order_by('-created_at')
+
+            def instances():
+                return list(queryset[:count])
+
+            def cards():
+                return get_cards(queryset, limit=count)
+
+            instance_time, instance_peak = _measure(instances, options['repeat'])
+            card_time, card_peak = _measure(cards, options['repeat'])
+            transaction.set_rollback(True)
+
+        per_thousand = 1000 / count
+        self.stdout.write(f"{'path':<16}  {'ms/1k':>8}  {'KiB/1k':>8}")
+        self.stdout.write(f"{'model instances':<16}  {instance_time * 1000 * per_thousand:>8.2f}  "
+                          f"{instance_peak / 1024 * per_thousand:>8.0f}")
+        self.stdout.write(f"{'listing cards':<16}  {card_time * 1000 * per_thousand:>8.2f}  "
+                          f"{card_peak / 1024 * per_thousand:>8.0f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Cards: {instance_time / card_time:.1f}x faster, "
+            f"{instance_peak / max(card_peak, 1):.1f}x less peak memory"
+        ))
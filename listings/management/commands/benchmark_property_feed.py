@@ -0,0 +1,74 @@
+# listings/management/commands/benchmark_property_feed.py
+import json
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from listings.property_feed import PropertyFeed, normalize_images
+
+
+def _uncached_lookup(path, pk):
+    """What property_detail used to do on every request"""
+    with open(path, 'r') as file:
+        properties = json.load(file)
+    property_obj = next((p for p in properties if p['id'] == pk), None)
+    property_obj['images'] = normalize_images(property_obj.get('images', []))
+    return property_obj
+
+
+def _fake_property(pk):
+    return {
+        'id': pk,
+        'name': f"Property {pk}",
+        'address': f"{pk} Main St, Killeen, TX",
+        'zip_code': '76542',
+        'price': 200000 + pk,
+        'bedrooms': 3,
+        'baths': 2,
+        'sq_ft': 1800,
+        'images': [f"/listings/home{i}.jpg" for i in range(1, 6)],
+    }
+
+
+class Command(BaseCommand):
+    help = "Per-request cost of a properties.json lookup, uncached vs PropertyFeed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,1000,10000,100000',
+                            help="Comma-separated feed sizes")
+        parser.add_argument('--requests', type=int, default=50,
+                            help="Lookups timed per feed size")
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        lookups = options['requests']
+
+        self.stdout.write(f"{'feed size':>10}  {'uncached ms':>12}  {'cached ms':>10}  {'speedup':>8}")
+        for size in [int(s) for s in options['sizes'].split(',')]:
+            with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+                json.dump([_fake_property(pk) for pk in range(1, size + 1)], f)
+                path = f.name
+            try:
+                ids = [rng.randint(1, size) for _ in range(lookups)]
+
+                start = time.perf_counter()
+                for pk in ids:
+                    _uncached_lookup(path, pk)
+                uncached = (time.perf_counter() - start) / lookups
+
+                feed = PropertyFeed(path)
+                feed.get(ids[0])  # first request pays for the parse
+                start = time.perf_counter()
+                for pk in ids:
+                    feed.get(pk)
+                cached = (time.perf_counter() - start) / lookups
+            finally:
+                os.unlink(path)
+
+            self.stdout.write(
+                f"{size:>10}  {uncached * 1000:>12.3f}  {cached * 1000:>10.4f}  "
+                f"{uncached / cached:>7.0f}x"
+            )
@@ -0,0 +1,101 @@
+# listings/management/commands/build_poi_index.py
+import csv
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from listings.poi_index import build_index
+
+# Source category/type values mapped onto the index's two categories
+CATEGORY_ALIASES = {
+    'school': 'school',
+    'schools': 'school',
+    'primary_school': 'school',
+    'secondary_school': 'school',
+    'grocery': 'grocery',
+    'groceries': 'grocery',
+    'grocery_store': 'grocery',
+    'grocery_or_supermarket': 'grocery',
+    'supermarket': 'grocery',
+}
+
+
+def _first(row, *keys):
+    for key in keys:
+        value = row.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _to_poi(props, lat, lng):
+    category = CATEGORY_ALIASES.get(
+        str(_first(props, 'category', 'type', 'amenity', 'shop') or '').strip().lower()
+    )
+    if category is None or lat is None or lng is None:
+        return None
+    rating = _first(props, 'rating')
+    return {
+        'name': _first(props, 'name') or '',
+        'category': category,
+        'lat': float(lat),
+        'lng': float(lng),
+        'rating': float(rating) if rating is not None else None,
+        'vicinity': _first(props, 'vicinity', 'address') or '',
+        'place_id': str(_first(props, 'place_id', 'id') or ''),
+    }
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            poi = _to_poi(row, _first(row, 'lat', 'latitude'),
+                          _first(row, 'lng', 'lon', 'longitude'))
+            if poi is not None:
+                yield poi
+
+
+def read_geojson(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    for feature in data.get('features', []):
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') != 'Point':
+            continue
+        lng, lat = geometry['coordinates'][:2]
+        poi = _to_poi(feature.get('properties') or {}, lat, lng)
+        if poi is not None:
+            yield poi
+
+
+class Command(BaseCommand):
+    help = "Build the offline school/grocery spatial index from CSV or GeoJSON files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('sources', nargs='+',
+                            help="CSV (name,category,lat,lng[,rating,vicinity]) or GeoJSON files")
+        parser.add_argument('--output', default=settings.POI_INDEX_DIR,
+                            help="Index directory (default: POI_INDEX_DIR)")
+        parser.add_argument('--cell-size', type=float, default=0.02,
+                            help="Grid cell size in degrees")
+
+    def handle(self, *args, **options):
+        pois = []
+        for path in options['sources']:
+            if not os.path.exists(path):
+                raise CommandError(f"{path} does not exist")
+            reader = read_csv if path.lower().endswith('.csv') else read_geojson
+            before = len(pois)
+            pois.extend(reader(path))
+            self.stdout.write(f"{path}: {len(pois) - before} POIs")
+
+        try:
+            count = build_index(pois, options['output'], cell_size=options['cell_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} POIs into {options['output']}; restart workers to pick it up"
+        ))
@@ -0,0 +1,153 @@
+# listings/management/commands/check_query_plans.py
+import json
+import os
+import random
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from listings.cards import card_queryset
+from listings.models import Listing, PropertyInterest, Review
+
+# Index names each hot query must keep using; a plan may use more
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'query_plans.json',
+)
+HOT_TABLES = {
+    Listing._meta.db_table,
+    Review._meta.db_table,
+    PropertyInterest._meta.db_table,
+}
+
+
+def hot_queries():
+    """The queries behind the hot views, as (name, queryset)"""
+    active = Listing.objects.filter(status='active')
+    approved = Review.objects.filter(is_approved=True)
+    return [
+        ('home_listings', card_queryset(active.order_by('-created_at'))[:4]),
+        ('search_keyset_page', active.order_by('-created_at', '-id')[:13]),
+        # About a 5 km box, the prefilter of a typical radius search
+        ('search_geo_box', active.filter(
+            latitude__range=(31.1, 31.15), longitude__range=(-97.75, -97.7),
+        ).values_list('pk', 'latitude', 'longitude')),
+        ('home_featured_reviews', approved.filter(featured=True).order_by('-created_at')[:4]),
+        ('reviews_list', approved.order_by('-featured', '-created_at', '-id')[:9]),
+        ('reviews_list_category', approved.filter(category='military')
+            .order_by('-featured', '-created_at')[:8]),
+        ('interest_dashboard', PropertyInterest.objects.order_by('-created_at', '-id')[:21]),
+        ('interest_dashboard_filtered', PropertyInterest.objects.filter(
+            status='new', interest_type='buyer', priority='high',
+        ).order_by('-created_at')[:20]),
+    ]
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def seed(count):
+    rng = random.Random(42)
+    Listing.objects.bulk_create([
+        Listing(
+            title=f"Plan check {i}",
+            status=rng.choice(['active', 'active', 'draft', 'inactive', 'sold']),
+            price=Decimal(rng.randrange(100000, 600000)),
+            latitude=31.0 + rng.random() * 0.4,
+            longitude=-97.95 + rng.random() * 0.5,
+        )
+        for i in range(count)
+    ], batch_size=1000)
+    Review.objects.bulk_create([
+        Review(
+            name=f"Reviewer {i}",
+            comment="Plan check",
+            rating=rng.randint(1, 5),
+            category=rng.choice(Review.REVIEW_CATEGORIES)[0],
+            is_approved=rng.random() < 0.7,
+            featured=rng.random() < 0.1,
+        )
+        for i in range(count)
+    ], batch_size=1000)
+    PropertyInterest.objects.bulk_create([
+        PropertyInterest(
+            interest_type=rng.choice(['buyer', 'seller']),
+            name=f"Lead {i}",
+            email=f"lead{i}@example.com",
+            property_type='house',
+            timeline='1-3 months',
+            status=rng.choice(PropertyInterest.STATUS_CHOICES)[0],
+            priority=rng.choice(PropertyInterest.PRIORITY_CHOICES)[0],
+        )
+        for i in range(count)
+    ], batch_size=1000)
+    with connection.cursor() as cursor:
+        for table in sorted(HOT_TABLES):
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot views' queries against a seeded dataset (rolled back "
+        "afterwards) and fail on sequential scans of the hot tables or on plans "
+        "that stop using their baseline indexes. PostgreSQL only; run by "
+        "listings.tests.QueryPlanTests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000,
+                            help="Rows seeded per table")
+        parser.add_argument('--update-baseline', action='store_true',
+                            help=f"Record the current plans in {os.path.basename(BASELINE_PATH)}")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Query plan checks need PostgreSQL")
+
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                baseline = json.load(f)
+
+        plans = {}
+        problems = []
+        with transaction.atomic():
+            seed(options['rows'])
+            with connection.cursor() as cursor:
+                # With sequential scans priced out, any Seq Scan left on a hot
+                # table means no index can serve the query
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            for name, queryset in hot_queries():
+                plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+                nodes = list(plan_nodes(plan))
+                indexes = sorted({node['Index Name'] for node in nodes if 'Index Name' in node})
+                plans[name] = indexes
+
+                for node in nodes:
+                    if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in HOT_TABLES:
+                        problems.append(f"{name}: sequential scan on {node['Relation Name']}")
+                if not options['update_baseline']:
+                    if name not in baseline:
+                        # A new hot query must not go unchecked
+                        problems.append(f"{name}: not in the baseline; record it with --update-baseline")
+                    elif set(baseline[name]) - set(indexes):
+                        dropped = ', '.join(sorted(set(baseline[name]) - set(indexes)))
+                        problems.append(f"{name}: no longer uses {dropped}")
+
+                self.stdout.write(f"{name:<28} {', '.join(indexes) or '-'}")
+            transaction.set_rollback(True)
+
+        if options['update_baseline']:
+            with open(BASELINE_PATH, 'w') as f:
+                json.dump(plans, f, indent=2, sort_keys=True)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {BASELINE_PATH}"))
+            return
+
+        if problems:
+            raise CommandError("Query plan regressions:\n  " + "\n  ".join(problems))
+        self.stdout.write(self.style.SUCCESS(f"{len(plans)} query plans OK"))
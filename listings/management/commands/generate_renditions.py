@@ -0,0 +1,49 @@
+# listings/management/commands/generate_renditions.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from listings.models import Listing, ListingImage
+from listings.renditions import generate_renditions
+
+
+def _generate(source_name, force):
+    try:
+        return generate_renditions(source_name, force=force)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Generate missing thumb/card/gallery/hero renditions for every listing photo"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help="Number of images to process in parallel")
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate renditions that already exist")
+
+    def handle(self, *args, **options):
+        names = set(
+            Listing.objects.exclude(main_image='').exclude(main_image__isnull=True)
+            .values_list('main_image', flat=True)
+        )
+        names.update(ListingImage.objects.values_list('image', flat=True))
+
+        created = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(_generate, name, options['force']): name
+                for name in sorted(names)
+            }
+            for future in as_completed(futures):
+                try:
+                    created += future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(names)} images checked, {created} renditions created, {failed} failed"
+        ))
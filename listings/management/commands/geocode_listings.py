@@ -0,0 +1,81 @@
+# listings/management/commands/geocode_listings.py
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from listings import clustering
+from listings.caching import LISTING_CONTENT, bump_content_version
+from listings.geocoding import RateLimiter, get_coordinates
+from listings.models import Listing
+
+
+def _geocode(address, rate_limiter):
+    try:
+        return get_coordinates(address, rate_limiter=rate_limiter)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Geocode listings without coordinates. Safe to interrupt: each batch is "
+        "saved as it completes and the next run picks up the rest. Set "
+        "GOOGLE_MAPS_API_BASE_URL to run against a stub geocoder."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help="Concurrent geocoding requests")
+        parser.add_argument('--qps', type=float, default=10,
+                            help="Maximum Geocoding API calls per second (0 = unlimited)")
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Listings saved per bulk_update")
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Stop after this many listings")
+
+    def handle(self, *args, **options):
+        queryset = (
+            Listing.objects.filter(latitude__isnull=True)
+            .only('pk', *Listing.LOCATION_FIELDS)
+            .order_by('pk')
+        )
+        remaining = queryset.count()
+        if options['limit'] is not None:
+            remaining = min(remaining, options['limit'])
+        self.stdout.write(f"{remaining} listings to geocode")
+
+        rate_limiter = RateLimiter(options['qps'])
+        batch_size = options['batch_size']
+        last_pk = 0
+        geocoded = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while geocoded + failed < remaining:
+                size = min(batch_size, remaining - geocoded - failed)
+                # Keyset over pk so listings that fail aren't retried this run
+                batch = list(queryset.filter(pk__gt=last_pk)[:size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+
+                addresses = [listing.get_geocode_address() for listing in batch]
+                found = []
+                for listing, (lat, lng) in zip(batch, executor.map(_geocode, addresses, repeat(rate_limiter))):
+                    if lat is None or lng is None:
+                        failed += 1
+                        continue
+                    listing.latitude, listing.longitude = lat, lng
+                    found.append(listing)
+                Listing.objects.bulk_update(found, ['latitude', 'longitude'])
+                geocoded += len(found)
+                self.stdout.write(f"  {geocoded + failed}/{remaining} done")
+
+        if geocoded:
+            # bulk_update skips save signals
+            bump_content_version(LISTING_CONTENT)
+            clustering.invalidate_all()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{geocoded} listings geocoded, {failed} could not be geocoded"
+        ))
@@ -0,0 +1,55 @@
+# listings/management/commands/import_listings.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from listings import clustering
+from listings.caching import HOME_CONTENT, LISTING_CONTENT, bump_content_version
+from listings.importer import (ListingImporter, feed_label, iter_json_array,
+                               read_chunks)
+
+
+class Command(BaseCommand):
+    help = "Stream a JSON listing feed (URL or file) into Listing, upserting on api_id"
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', nargs='?', default=settings.MOCKAROO_API_URL,
+                            help="Feed URL or JSON file (default: MOCKAROO_API_URL)")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Rows per upsert statement")
+        parser.add_argument('--show-errors', type=int, default=10,
+                            help="How many rejected rows to print")
+        parser.add_argument('--keep-missing', action='store_true',
+                            help="Don't deactivate API listings absent from this feed")
+
+    def handle(self, *args, **options):
+        source = options['source']
+        importer = ListingImporter(batch_size=options['batch_size'])
+        self.stdout.write(f"Importing from {feed_label(source)}")
+
+        start = time.perf_counter()
+        try:
+            importer.run(iter_json_array(read_chunks(source)),
+                         deactivate_missing=not options['keep_missing'])
+        except (OSError, ValueError) as e:
+            # requests' exceptions are OSErrors too
+            raise CommandError(f"Import stopped after {importer.written} writes: {e}")
+        finally:
+            if importer.written:
+                # bulk_create skips save signals
+                bump_content_version(HOME_CONTENT)
+                bump_content_version(LISTING_CONTENT)
+                clustering.invalidate_all()
+        elapsed = time.perf_counter() - start
+
+        for row_number, message in importer.errors[:options['show_errors']]:
+            self.stderr.write(f"Row {row_number}: {message}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{importer.rows} rows in {elapsed:.1f}s "
+            f"({importer.rows / max(elapsed, 1e-9):.0f} rows/s): "
+            f"{importer.inserted} inserted, {importer.updated} updated, "
+            f"{importer.unchanged} unchanged, {importer.skipped} skipped, "
+            f"{importer.deactivated} deactivated"
+        ))
@@ -0,0 +1,15 @@
+# listings/management/commands/rebuild_review_stats.py
+from django.core.management.base import BaseCommand
+
+from listings.models import ReviewStats
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized ReviewStats row from the Review table"
+
+    def handle(self, *args, **options):
+        stats = ReviewStats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Review stats rebuilt: {stats.total_count} total, "
+            f"{stats.approved_count} approved, {stats.featured_count} featured"
+        ))
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:30
+
+from django.db import migrations, models
+
+
+def build_review_stats(apps, schema_editor):
+    Review = apps.get_model('listings', 'Review')
+    ReviewStats = apps.get_model('listings', 'ReviewStats')
+
+    reviews = Review.objects.order_by()
+    approved = reviews.filter(is_approved=True)
+    totals = reviews.aggregate(
+        total=models.Count('pk'),
+        approved=models.Count('pk', filter=models.Q(is_approved=True)),
+        featured=models.Count('pk', filter=models.Q(is_approved=True, featured=True)),
+        rating_sum=models.Sum('rating', filter=models.Q(is_approved=True)),
+    )
+    ReviewStats.objects.update_or_create(pk=1, defaults={
+        'total_count': totals['total'],
+        'approved_count': totals['approved'],
+        'featured_count': totals['featured'],
+        'rating_sum': totals['rating_sum'] or 0,
+        'rating_histogram': {
+            str(row['rating']): row['count']
+            for row in approved.values('rating').annotate(count=models.Count('pk'))
+        },
+        'category_counts': {
+            row['category']: row['count']
+            for row in approved.values('category').annotate(count=models.Count('pk'))
+        },
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0005_review'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_count', models.IntegerField(default=0)),
+                ('approved_count', models.IntegerField(default=0)),
+                ('featured_count', models.IntegerField(default=0, help_text='Approved and featured')),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_histogram', models.JSONField(default=dict, help_text='Approved reviews per star rating')),
+                ('category_counts', models.JSONField(default=dict, help_text='Approved reviews per category')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Review Statistics',
+                'verbose_name_plural': 'Review Statistics',
+            },
+        ),
+        migrations.RunPython(build_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:45
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_image_summary(apps, schema_editor):
+    Listing = apps.get_model('listings', 'Listing')
+    ListingImage = apps.get_model('listings', 'ListingImage')
+
+    images = ListingImage.objects.filter(listing=models.OuterRef('pk'))
+    first_image = images.order_by('order', 'created_at').values('image')[:1]
+    image_count = images.order_by().values('listing').annotate(
+        count=models.Count('pk')
+    ).values('count')
+
+    Listing.objects.update(
+        cover_image=Coalesce(models.Subquery(first_image), models.Value('')),
+        image_count=Coalesce(models.Subquery(image_count), models.Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0006_reviewstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='cover_image',
+            field=models.CharField(blank=True, editable=False, help_text='First additional image, shown when there is no main image', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='image_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_image_summary, migrations.RunPython.noop),
+    ]
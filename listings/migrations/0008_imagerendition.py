@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0007_listing_cover_image_listing_image_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_name', models.CharField(help_text='Storage name of the original image', max_length=255)),
+                ('size', models.CharField(choices=[('thumb', 'Thumbnail'), ('card', 'Card'), ('gallery', 'Gallery'), ('hero', 'Hero')], max_length=20)),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('jpeg', 'JPEG')], max_length=10)),
+                ('file', models.CharField(max_length=255)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('file_size', models.PositiveIntegerField(help_text='Bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source_name', 'size', 'format'), name='unique_image_rendition')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:20
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The trigger and GIN index only exist on PostgreSQL; other backends
+# (e.g. the SQLite backup) fall back to icontains matching in
+# listings/search.py.
+CREATE_SEARCH_TRIGGER = """
+CREATE OR REPLACE FUNCTION listings_listing_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.address, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER listings_listing_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, address, description
+    ON listings_listing
+    FOR EACH ROW EXECUTE FUNCTION listings_listing_search_vector_update();
+
+UPDATE listings_listing SET title = title;
+
+CREATE INDEX listings_listing_search_vector_gin
+    ON listings_listing USING gin (search_vector);
+"""
+
+DROP_SEARCH_TRIGGER = """
+DROP INDEX IF EXISTS listings_listing_search_vector_gin;
+DROP TRIGGER IF EXISTS listings_listing_search_vector_trigger ON listings_listing;
+DROP FUNCTION IF EXISTS listings_listing_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_TRIGGER)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0008_imagerendition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
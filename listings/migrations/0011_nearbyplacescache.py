@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0010_geocodecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NearbyPlacesCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell_key', models.CharField(help_text="Grid cell centre as 'lat,lng'", max_length=40)),
+                ('place_type', models.CharField(max_length=50)),
+                ('keyword', models.CharField(blank=True, max_length=100)),
+                ('places', models.TextField(help_text='Compact JSON rows: [place_id, name, vicinity, rating, lat, lng]')),
+                ('fetched_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Nearby Places Cache Entry',
+                'verbose_name_plural': 'Nearby Places Cache',
+                'constraints': [models.UniqueConstraint(fields=('cell_key', 'place_type', 'keyword'), name='unique_nearby_places_cell')],
+            },
+        ),
+    ]
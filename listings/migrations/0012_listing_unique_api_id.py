@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+def normalize_api_ids(apps, schema_editor):
+    Listing = apps.get_model('listings', 'Listing')
+
+    Listing.objects.filter(api_id='').update(api_id=None)
+
+    # Keep the most recently updated listing for each duplicated api_id
+    duplicates = (
+        Listing.objects.exclude(api_id=None).order_by()
+        .values('api_id').annotate(count=models.Count('pk')).filter(count__gt=1)
+        .values_list('api_id', flat=True)
+    )
+    for api_id in list(duplicates):
+        keep = Listing.objects.filter(api_id=api_id).order_by('-updated_at', '-pk').first()
+        Listing.objects.filter(api_id=api_id).exclude(pk=keep.pk).update(api_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0011_nearbyplacescache'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_api_ids, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='listing',
+            constraint=models.UniqueConstraint(fields=('api_id',), name='unique_listing_api_id'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0014_listing_latitude_longitude'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['-created_at', '-id'], name='listing_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['status', '-created_at'], name='listing_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyinterest',
+            index=models.Index(fields=['status', 'interest_type', 'priority', '-created_at'], name='interest_filter_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyinterest',
+            index=models.Index(fields=['-created_at', '-id'], name='interest_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['-featured', '-created_at', '-id'], name='review_approved_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['category', '-featured', '-created_at'], name='review_approved_category_idx'),
+        ),
+    ]
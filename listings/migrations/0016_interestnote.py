@@ -0,0 +1,84 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:05
+
+import re
+from datetime import datetime, timezone as dt_timezone
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# interest_detail wrote each note as "[YYYY-MM-DD HH:MM] text" (UTC),
+# separated by a blank line
+STAMP = re.compile(r'(?:^|\n\n)\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2})\] ')
+STAMP_FORMAT = '%Y-%m-%d %H:%M'
+
+
+def split_notes(text, default_time):
+    """(created_at, body) pairs for one legacy notes value"""
+    matches = list(STAMP.finditer(text))
+    notes = []
+    # Anything before the first stamp was typed in the admin
+    head = text[:matches[0].start()] if matches else text
+    if head.strip():
+        notes.append((default_time, head.strip()))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        created_at = datetime.strptime(match.group(1), STAMP_FORMAT).replace(tzinfo=dt_timezone.utc)
+        body = text[match.end():end].strip()
+        if body:
+            notes.append((created_at, body))
+    return notes
+
+
+def forwards(apps, schema_editor):
+    PropertyInterest = apps.get_model('listings', 'PropertyInterest')
+    InterestNote = apps.get_model('listings', 'InterestNote')
+
+    batch = []
+    interests = PropertyInterest.objects.exclude(notes='').values_list('pk', 'created_at', 'notes')
+    for pk, created_at, text in interests.iterator():
+        for note_time, body in split_notes(text, created_at):
+            batch.append(InterestNote(interest_id=pk, created_at=note_time, body=body))
+        if len(batch) >= 1000:
+            InterestNote.objects.bulk_create(batch)
+            batch = []
+    InterestNote.objects.bulk_create(batch)
+
+
+def backwards(apps, schema_editor):
+    PropertyInterest = apps.get_model('listings', 'PropertyInterest')
+    InterestNote = apps.get_model('listings', 'InterestNote')
+
+    texts = {}
+    for note in InterestNote.objects.order_by('interest_id', 'created_at', 'pk').iterator():
+        stamp = note.created_at.astimezone(dt_timezone.utc).strftime(STAMP_FORMAT)
+        texts.setdefault(note.interest_id, []).append(f"[{stamp}] {note.body}")
+    for pk, entries in texts.items():
+        PropertyInterest.objects.filter(pk=pk).update(notes='\n\n'.join(entries))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0015_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterestNote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('body', models.TextField()),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='interest_notes', to=settings.AUTH_USER_MODEL)),
+                ('interest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='note_entries', to='listings.propertyinterest')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['interest', 'created_at'], name='interest_note_created_idx')],
+            },
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0016_interestnote'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='propertyinterest',
+            name='notes',
+        ),
+        migrations.AlterField(
+            model_name='interestnote',
+            name='interest',
+            field=models.ForeignKey(on_delete=models.deletion.CASCADE, related_name='notes', to='listings.propertyinterest'),
+        ),
+    ]
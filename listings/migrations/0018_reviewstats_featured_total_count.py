@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:30
+
+from django.db import migrations, models
+
+
+def count_featured(apps, schema_editor):
+    Review = apps.get_model('listings', 'Review')
+    ReviewStats = apps.get_model('listings', 'ReviewStats')
+    ReviewStats.objects.filter(pk=1).update(
+        featured_total_count=Review.objects.filter(featured=True).count()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0017_remove_propertyinterest_notes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewstats',
+            name='featured_total_count',
+            field=models.IntegerField(default=0, help_text='Featured, approved or not'),
+        ),
+        migrations.RunPython(count_featured, migrations.RunPython.noop),
+    ]
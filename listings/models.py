@@ -1,7 +1,8 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils import timezone
-from django.core.files.storage import FileSystemStorage
+from django.core.files.storage import FileSystemStorage, default_storage
 from django.conf import settings
 import os
 from django.contrib.auth.models import User
@@ -48,6 +49,9 @@ class Listing(models.Model):
     city = models.CharField(max_length=100, default="Killeen")
     state = models.CharField(max_length=50, default='TX')
     zip_code = models.CharField(max_length=10, blank=True, default="76541")
+    # Filled by `manage.py geocode_listings`; cleared when the address changes
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     
     # Property Details - ADD DEFAULTS TO THESE FIELDS
     beds = models.IntegerField(default=3)
@@ -56,6 +60,17 @@ class Listing(models.Model):
     
     # Media
     main_image = models.ImageField(upload_to='properties/main/', null=True, blank=True)
+    # Kept in sync by the ListingImage signal handlers
+    cover_image = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        help_text="First additional image, shown when there is no main image"
+    )
+    image_count = models.PositiveIntegerField(default=0, editable=False)
+    # Hash of the fields import_listings last wrote, so unchanged feed rows
+    # can be skipped
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
     
     # Status and Features
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
@@ -65,22 +80,96 @@ class Listing(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Full-text search document (title > address > description), filled by
+    # a database trigger on PostgreSQL; unused on other backends
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            # NULLs never conflict, so only imported listings are constrained;
+            # import_listings upserts with ON CONFLICT (api_id)
+            models.UniqueConstraint(fields=['api_id'], name='unique_listing_api_id'),
+        ]
+        indexes = [
+            models.Index(fields=['latitude', 'longitude'], name='listing_lat_lng_idx'),
+            # Home page, search and keyset pages: newest active listings
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='listing_active_recent_idx',
+                condition=models.Q(status='active'),
+            ),
+            models.Index(fields=['status', '-created_at'], name='listing_status_created_idx'),
+        ]
+    
+    LOCATION_FIELDS = ('address', 'city', 'state', 'zip_code')
+    # What the map clusters depend on (listings/clustering.py)
+    CLUSTER_FIELDS = ('status', 'price', 'latitude', 'longitude')
     
     def __str__(self):
         return f"{self.title} - ${self.price}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the address as loaded so save() can spot a move
+        if all(field in field_names for field in cls.LOCATION_FIELDS):
+            instance._loaded_location = instance.get_location_key()
+        if all(field in field_names for field in cls.CLUSTER_FIELDS):
+            instance._loaded_cluster_state = instance.get_cluster_state()
+        # So a replaced upload's renditions can be removed (listings/signals.py)
+        if 'main_image' in field_names:
+            instance._loaded_image = instance.main_image.name
+        return instance
+    
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_location', None)
+        if loaded is not None and loaded != self.get_location_key():
+            # Stale coordinates; geocode_listings will pick it up again
+            self.latitude = self.longitude = None
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude'}
+        super().save(*args, **kwargs)
+        self._loaded_location = self.get_location_key()
+    
+    def get_location_key(self):
+        return tuple(getattr(self, field) for field in self.LOCATION_FIELDS)
+    
+    def get_cluster_state(self):
+        return tuple(getattr(self, field) for field in self.CLUSTER_FIELDS)
+    
+    def get_geocode_address(self):
+        """Full address as sent to the geocoder"""
+        return f"{self.address}, {self.city}, {self.state} {self.zip_code}".strip()
+    
     def get_first_image(self):
         if self.main_image:
             return self.main_image.url
-        first_additional = self.additional_images.first()
-        if first_additional:
-            return first_additional.image.url
+        if self.cover_image:
+            return default_storage.url(self.cover_image)
         return None
     
     def get_additional_images_count(self):
-        return self.additional_images.count()
+        return self.image_count
+    
+    def get_first_image_name(self):
+        """Storage name of the card image, for looking up its renditions"""
+        if self.main_image:
+            return self.main_image.name
+        return self.cover_image or None
+    
+    def refresh_image_summary(self):
+        """Recompute cover_image and image_count from the additional images"""
+        images = self.additional_images.all()
+        first_additional = images.first()
+        self.cover_image = first_additional.image.name if first_additional else ''
+        self.image_count = images.count()
+        # update() so the listing's updated_at and save signals are untouched
+        Listing.objects.filter(pk=self.pk).update(
+            cover_image=self.cover_image,
+            image_count=self.image_count,
+        )
 
 
 class ListingImage(models.Model):
@@ -99,6 +188,50 @@ class ListingImage(models.Model):
     
     def __str__(self):
         return f"Image for {self.listing.title}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # So a replaced upload's renditions can be removed (listings/signals.py)
+        if 'image' in field_names:
+            instance._loaded_image = instance.image.name
+        return instance
+
+
+
+class ImageRendition(models.Model):
+    """A resized copy of an uploaded image (see listings/renditions.py)"""
+    SIZE_CHOICES = [
+        ('thumb', 'Thumbnail'),
+        ('card', 'Card'),
+        ('gallery', 'Gallery'),
+        ('hero', 'Hero'),
+    ]
+    
+    FORMAT_CHOICES = [
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    ]
+    
+    source_name = models.CharField(max_length=255, help_text="Storage name of the original image")
+    size = models.CharField(max_length=20, choices=SIZE_CHOICES)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    file = models.CharField(max_length=255)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file_size = models.PositiveIntegerField(help_text="Bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source_name', 'size', 'format'],
+                name='unique_image_rendition',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.source_name} ({self.size}, {self.format})"
       
 
 class AgentProfile(models.Model):
@@ -193,6 +326,48 @@ class AgentProfile(models.Model):
 
 
 
+class GeocodeCache(models.Model):
+    """Persistent cache of Geocoding API answers (see listings/geocoding.py)"""
+    STATUS_OK = 'OK'
+    STATUS_ERROR = 'ERROR'
+    
+    address_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the normalized address")
+    address = models.CharField(max_length=255)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    status = models.CharField(max_length=30, help_text="Geocoding API status, or ERROR if the call failed")
+    fetched_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = "Geocode Cache Entry"
+        verbose_name_plural = "Geocode Cache"
+    
+    def __str__(self):
+        return f"{self.address} ({self.status})"
+
+
+class NearbyPlacesCache(models.Model):
+    """Places API results for one grid cell (see listings/places.py)"""
+    cell_key = models.CharField(max_length=40, help_text="Grid cell centre as 'lat,lng'")
+    place_type = models.CharField(max_length=50)
+    keyword = models.CharField(max_length=100, blank=True)
+    places = models.TextField(help_text="Compact JSON rows: [place_id, name, vicinity, rating, lat, lng]")
+    fetched_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = "Nearby Places Cache Entry"
+        verbose_name_plural = "Nearby Places Cache"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cell_key', 'place_type', 'keyword'],
+                name='unique_nearby_places_cell',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.place_type} near {self.cell_key}"
+
+
 class ContactInquiry(models.Model):
     listing = models.ForeignKey(Listing, on_delete=models.SET_NULL, null=True, blank=True)
     name = models.CharField(max_length=120)
@@ -487,7 +662,6 @@ class PropertyInterest(models.Model):
     
     # New management fields
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='new')
-    notes = models.TextField(blank=True)
     assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, 
                                     related_name='assigned_interests')
     contacted_date = models.DateTimeField(null=True, blank=True)
@@ -496,6 +670,14 @@ class PropertyInterest(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # interest_dashboard filters
+            models.Index(
+                fields=['status', 'interest_type', 'priority', '-created_at'],
+                name='interest_filter_idx',
+            ),
+            models.Index(fields=['-created_at', '-id'], name='interest_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.get_interest_type_display()}"
@@ -546,6 +728,26 @@ class PropertyInterest(models.Model):
         return info 
 
 
+class InterestNote(models.Model):
+    """One note on a property interest; notes are only ever appended"""
+    interest = models.ForeignKey(PropertyInterest, on_delete=models.CASCADE, related_name='notes')
+    author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                               related_name='interest_notes')
+    # Not auto_now_add, so notes split out of the old text field keep their
+    # original timestamps
+    created_at = models.DateTimeField(default=timezone.now)
+    body = models.TextField()
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['interest', 'created_at'], name='interest_note_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Note on {self.interest_id} at {self.created_at:%Y-%m-%d %H:%M}"
+
+
 
 class Review(models.Model):
     REVIEW_CATEGORIES = [
@@ -588,14 +790,48 @@ class Review(models.Model):
         related_name='reviews'
     )
     
+    # Fields that ReviewStats aggregates over
+    STATS_FIELDS = ('is_approved', 'rating', 'featured', 'category')
+    
     class Meta:
         ordering = ['-created_at', '-featured']
         verbose_name = "Client Review"
         verbose_name_plural = "Client Reviews"
+        indexes = [
+            # reviews_list and the home page's featured reviews
+            models.Index(
+                fields=['-featured', '-created_at', '-id'],
+                name='review_approved_feed_idx',
+                condition=models.Q(is_approved=True),
+            ),
+            models.Index(
+                fields=['category', '-featured', '-created_at'],
+                name='review_approved_category_idx',
+                condition=models.Q(is_approved=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.rating} stars"
     
+    def save(self, *args, **kwargs):
+        # The ReviewStats delta is stored row -> saved row; the signal
+        # handlers read the stored row under a lock, which needs the write
+        # and the stats update in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def get_stored_stats(self):
+        """STATS_FIELDS as stored now, locking the row; None if not stored"""
+        return (
+            Review.objects.select_for_update()
+            .filter(pk=self.pk).values(*self.STATS_FIELDS).first()
+        )
+    
+    def get_stats_snapshot(self):
+        """Values of the fields ReviewStats aggregates over"""
+        return {field: getattr(self, field) for field in self.STATS_FIELDS}
+    
     def get_stars(self):
         """Generate star rating HTML"""
         full_stars = self.rating
@@ -626,4 +862,143 @@ class Review(models.Model):
     
     def get_category_display_name(self):
         """Get category display name"""
-        return dict(self.REVIEW_CATEGORIES).get(self.category, 'General Experience')
\ No newline at end of file
+        return dict(self.REVIEW_CATEGORIES).get(self.category, 'General Experience')
+
+
+class ReviewStats(models.Model):
+    """
+    Single-row running totals over the Review table.
+
+    Kept up to date by the Review signal handlers and by
+    ReviewStats.update_reviews() for queryset updates, so the stats
+    endpoints never have to aggregate the whole table. Run
+    ``manage.py rebuild_review_stats`` if it ever drifts.
+    """
+    total_count = models.IntegerField(default=0)
+    approved_count = models.IntegerField(default=0)
+    featured_count = models.IntegerField(default=0, help_text="Approved and featured")
+    featured_total_count = models.IntegerField(default=0, help_text="Featured, approved or not")
+    rating_sum = models.IntegerField(default=0)
+    rating_histogram = models.JSONField(default=dict, help_text="Approved reviews per star rating")
+    category_counts = models.JSONField(default=dict, help_text="Approved reviews per category")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Review Statistics"
+        verbose_name_plural = "Review Statistics"
+    
+    def __str__(self):
+        return f"{self.approved_count} approved reviews"
+    
+    @classmethod
+    def get_solo(cls):
+        """Get the stats row, building it from scratch if it doesn't exist yet"""
+        stats = cls.objects.filter(pk=1).first()
+        if stats is None:
+            stats = cls.rebuild()
+        return stats
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute every counter from the Review table"""
+        with transaction.atomic():
+            stats, _ = cls.objects.select_for_update().get_or_create(pk=1)
+            reviews = Review.objects.order_by()
+            approved = reviews.filter(is_approved=True)
+            
+            totals = reviews.aggregate(
+                total=models.Count('pk'),
+                approved=models.Count('pk', filter=models.Q(is_approved=True)),
+                approved_featured=models.Count('pk', filter=models.Q(is_approved=True, featured=True)),
+                all_featured=models.Count('pk', filter=models.Q(featured=True)),
+                rating_sum=models.Sum('rating', filter=models.Q(is_approved=True)),
+            )
+            stats.total_count = totals['total']
+            stats.approved_count = totals['approved']
+            stats.featured_count = totals['approved_featured']
+            stats.featured_total_count = totals['all_featured']
+            stats.rating_sum = totals['rating_sum'] or 0
+            stats.rating_histogram = {
+                str(row['rating']): row['count']
+                for row in approved.values('rating').annotate(count=models.Count('pk'))
+            }
+            stats.category_counts = {
+                row['category']: row['count']
+                for row in approved.values('category').annotate(count=models.Count('pk'))
+            }
+            stats.save()
+        return stats
+    
+    @classmethod
+    def record_changes(cls, changes):
+        """
+        Apply (old, new) review snapshot pairs to the running totals.
+        Use None for the old side of a new review or the new side of a
+        deleted one.
+        """
+        changes = [(old, new) for old, new in changes if old != new]
+        if not changes:
+            return
+        with transaction.atomic():
+            stats, created = cls.objects.select_for_update().get_or_create(pk=1)
+            if created:
+                # A fresh row is built from the current table, changes included
+                cls.rebuild()
+                return
+            for old, new in changes:
+                if old is not None:
+                    stats._add(old, -1)
+                if new is not None:
+                    stats._add(new, 1)
+            stats.save()
+    
+    @classmethod
+    def update_reviews(cls, queryset, **fields):
+        """queryset.update(**fields) that keeps the stats row in step"""
+        with transaction.atomic():
+            rows = list(queryset.select_for_update().values(*Review.STATS_FIELDS))
+            updated = queryset.update(**fields)
+            cls.record_changes((row, {**row, **fields}) for row in rows)
+        return updated
+    
+    @staticmethod
+    def _bump(counts, key, sign):
+        # Empty buckets are dropped, as rebuild() never produces them
+        counts[key] = counts.get(key, 0) + sign
+        if not counts[key]:
+            del counts[key]
+    
+    def _add(self, snapshot, sign):
+        self.total_count += sign
+        if snapshot['featured']:
+            self.featured_total_count += sign
+        if not snapshot['is_approved']:
+            return
+        rating = str(snapshot['rating'])
+        category = snapshot['category']
+        self.approved_count += sign
+        self.rating_sum += sign * snapshot['rating']
+        self._bump(self.rating_histogram, rating, sign)
+        self._bump(self.category_counts, category, sign)
+        if snapshot['featured']:
+            self.featured_count += sign
+    
+    @property
+    def pending_count(self):
+        return self.total_count - self.approved_count
+    
+    @property
+    def avg_rating(self):
+        if not self.approved_count:
+            return None
+        return self.rating_sum / self.approved_count
+    
+    @property
+    def five_star_count(self):
+        return self.rating_histogram.get('5', 0)
+    
+    def get_category_count(self, category):
+        """Approved reviews in a category, or all approved reviews for 'all'"""
+        if category == 'all':
+            return self.approved_count
+        return self.category_counts.get(category, 0)
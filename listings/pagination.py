@@ -0,0 +1,152 @@
+# listings/pagination.py
+"""
+Keyset (cursor) pagination.
+
+Paginator pays for a COUNT(*) and an OFFSET scan on every page, and both
+grow with the table. CursorPaginator instead remembers the sort key of the
+last row it returned and asks for rows "after" it, which an index on the
+sort columns answers directly at any depth. Page tokens are opaque
+base64 strings; totals come from the planner's estimate rather than an
+exact count.
+"""
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+
+
+def estimate_count(queryset):
+    """
+    Cheap row count: pg_class.reltuples for a whole table, the planner's
+    row estimate for a filtered queryset, and an exact COUNT elsewhere.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed/analyzed
+        if row and row[0] >= 0:
+            return int(row[0])
+        return queryset.count()
+
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CursorPage:
+    """One page of results; iterates like a Paginator Page"""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, paginator):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginate a queryset by a unique sort key, newest first by default.
+
+    ``ordering`` must end in a unique field so the key is total, and all
+    fields must sort in the same direction.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.field_names = [name.lstrip('-') for name in self.ordering]
+        self.fields = [queryset.model._meta.get_field(name) for name in self.field_names]
+
+    @property
+    def count(self):
+        """Estimated total number of rows (see estimate_count)"""
+        if not hasattr(self, '_count'):
+            self._count = estimate_count(self.queryset)
+        return self._count
+
+    def encode_cursor(self, obj, direction):
+        values = [field.value_to_string(obj) for field in self.fields]
+        payload = json.dumps({'d': direction, 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        """Return (direction, values) for a token, or None if it's invalid"""
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, raw_values = payload['d'], payload['v']
+            if direction not in ('n', 'p') or len(raw_values) != len(self.fields):
+                return None
+            values = [field.to_python(value) for field, value in zip(self.fields, raw_values)]
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            return None
+        return direction, values
+
+    def _keyset_filter(self, values, forward):
+        # Rows strictly past `values` in the requested direction:
+        # (a < va) OR (a = va AND b < vb) OR ...
+        lookup = 'lt' if forward == self.descending else 'gt'
+        conditions = []
+        for i, name in enumerate(self.field_names):
+            condition = {f'{name}__{lookup}': values[i]}
+            condition.update(
+                {self.field_names[j]: values[j] for j in range(i)}
+            )
+            conditions.append(Q(**condition))
+        return reduce(or_, conditions)
+
+    def get_page(self, cursor=None):
+        decoded = self.decode_cursor(cursor) if cursor else None
+
+        if decoded is None or decoded[0] == 'n':
+            queryset = self.queryset.order_by(*self.ordering)
+            if decoded is not None:
+                queryset = queryset.filter(self._keyset_filter(decoded[1], forward=True))
+            rows = list(queryset[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            next_cursor = self.encode_cursor(rows[-1], 'n') if rows and has_more else None
+            previous_cursor = self.encode_cursor(rows[0], 'p') if rows and decoded else None
+        else:
+            reverse_ordering = [
+                name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering
+            ]
+            queryset = self.queryset.order_by(*reverse_ordering).filter(
+                self._keyset_filter(decoded[1], forward=False)
+            )
+            rows = list(queryset[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            next_cursor = self.encode_cursor(rows[-1], 'n') if rows else None
+            previous_cursor = self.encode_cursor(rows[0], 'p') if rows and has_more else None
+
+        return CursorPage(rows, next_cursor, previous_cursor, self)
@@ -0,0 +1,210 @@
+# listings/places.py
+"""
+Nearby places (schools, groceries) around a property.
+
+Places API answers are cached per grid cell rather than per listing: the
+search is made from the centre of a PLACES_GRID_CELL_DEGREES cell, the
+results are stored as compact JSON in NearbyPlacesCache, and distances are
+recomputed from each listing's exact coordinates on the way out
+(listings/geo.py). Listings
+in the same neighbourhood therefore share one upstream fetch.
+"""
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .geo import rank_places
+from .google_client import GoogleApiError, google_client
+from .models import NearbyPlacesCache
+
+logger = logging.getLogger(__name__)
+
+SEARCH_RADIUS_M = 5000  # 5km radius
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.NEARBY_LOOKUP_WORKERS,
+            thread_name_prefix='nearby',
+        )
+    return _executor
+
+
+def _run_in_worker(func, *args):
+    # Like a request: each pool thread keeps its own persistent connection
+    # (CONN_MAX_AGE), dropped only once it has expired or broken
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+def calculate_distance(lat1, lng1, lat2, lng2):
+    """Calculate distance between two coordinates using Haversine formula"""
+    R = 6371  # Earth's radius in kilometers
+
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lng = math.radians(lng2 - lng1)
+
+    a = (math.sin(delta_lat/2) * math.sin(delta_lat/2) +
+         math.cos(lat1_rad) * math.cos(lat2_rad) *
+         math.sin(delta_lng/2) * math.sin(delta_lng/2))
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+
+    return R * c  # Distance in kilometers
+
+
+def grid_cell(lat, lng):
+    """Centre of the grid cell containing a point, as (lat, lng)"""
+    step = settings.PLACES_GRID_CELL_DEGREES
+    return (round(round(lat / step) * step, 6), round(round(lng / step) * step, 6))
+
+
+def fetch_nearby_places(lat, lng, place_type, keyword=None):
+    """Call the Places API; returns the raw result list or None on failure"""
+    params = {
+        "location": f"{lat},{lng}",
+        "radius": SEARCH_RADIUS_M,
+        "type": place_type,
+    }
+    if keyword:
+        params["keyword"] = keyword
+
+    try:
+        data = google_client.get_json("place/nearbysearch/json", params)
+    except GoogleApiError as e:
+        logger.warning("Places API failed for %s: %s", place_type, e)
+        return None
+
+    if data['status'] == 'OK':
+        return data.get("results", [])
+    if data['status'] == 'ZERO_RESULTS':
+        return []
+
+    logger.warning("Places API error for %s: %s %s", place_type, data['status'],
+                   data.get('error_message', ''))
+    return None
+
+
+def compact_places(places):
+    """Keep only what the detail page shows: [place_id, name, vicinity, rating, lat, lng]"""
+    rows = []
+    for place in places:
+        location = place['geometry']['location']
+        rows.append([
+            place.get('place_id', ''),
+            place.get('name', ''),
+            place.get('vicinity', ''),
+            place.get('rating'),
+            location['lat'],
+            location['lng'],
+        ])
+    return rows
+
+
+def expand_places(rows, lat, lng):
+    """Turn compact rows back into Places-API-shaped dicts, nearest to (lat, lng) first"""
+    places = []
+    for place_id, name, vicinity, rating, place_lat, place_lng in rows:
+        place = {
+            'place_id': place_id,
+            'name': name,
+            'vicinity': vicinity,
+            'geometry': {'location': {'lat': place_lat, 'lng': place_lng}},
+        }
+        if rating is not None:
+            place['rating'] = rating
+        places.append(place)
+    return rank_places(lat, lng, places)
+
+
+def get_nearby_places(lat, lng, place_type, keyword=None):
+    """Places of a type near (lat, lng), each with distance_km / distance_miles"""
+    cell_lat, cell_lng = grid_cell(lat, lng)
+    cell_key = f"{cell_lat:.6f},{cell_lng:.6f}"
+    keyword = keyword or ''
+
+    entry = NearbyPlacesCache.objects.filter(
+        cell_key=cell_key, place_type=place_type, keyword=keyword
+    ).first()
+    ttl = timedelta(seconds=settings.PLACES_CACHE_TTL)
+    if entry is not None and timezone.now() - entry.fetched_at < ttl:
+        return expand_places(json.loads(entry.places), lat, lng)
+
+    places = fetch_nearby_places(cell_lat, cell_lng, place_type, keyword)
+    if places is None:
+        # Upstream failed: serve whatever we had, however old
+        rows = json.loads(entry.places) if entry is not None else []
+        return expand_places(rows, lat, lng)
+
+    rows = compact_places(places)
+    NearbyPlacesCache.objects.update_or_create(
+        cell_key=cell_key,
+        place_type=place_type,
+        keyword=keyword,
+        defaults={
+            'places': json.dumps(rows, separators=(',', ':')),
+            'fetched_at': timezone.now(),
+        },
+    )
+    return expand_places(rows, lat, lng)
+
+
+def call_with_timeout(timeout, default, func, *args):
+    """
+    Run func(*args) on the lookup pool and wait at most `timeout` seconds.
+    On timeout the call keeps running (and fills the caches for the next
+    request) but we return `default` now; errors also return `default`.
+    """
+    future = _get_executor().submit(_run_in_worker, func, *args)
+    try:
+        return future.result(timeout=max(timeout, 0))
+    except FutureTimeoutError:
+        # Not the builtin TimeoutError before Python 3.11
+        logger.warning("%s timed out after %.1fs", func.__name__, timeout)
+        return default
+    except Exception:
+        logger.exception("%s failed", func.__name__)
+        return default
+
+
+def get_nearby_places_concurrently(lat, lng, searches, timeout):
+    """
+    Run several get_nearby_places() searches in parallel.
+
+    `searches` maps a result name to (place_type, keyword). Returns the
+    same names mapped to place lists; searches that fail or miss the
+    deadline come back empty so the page can still render.
+    """
+    executor = _get_executor()
+    futures = {
+        name: executor.submit(_run_in_worker, get_nearby_places, lat, lng, place_type, keyword)
+        for name, (place_type, keyword) in searches.items()
+    }
+    done, _ = wait(futures.values(), timeout=max(timeout, 0))
+
+    results = {}
+    for name, future in futures.items():
+        if future in done and future.exception() is None:
+            results[name] = future.result()
+        else:
+            if future not in done:
+                logger.warning("Nearby %s lookup missed the %.1fs deadline", name, timeout)
+            else:
+                logger.warning("Nearby %s lookup failed: %s", name, future.exception())
+            results[name] = []
+    return results
@@ -0,0 +1,204 @@
+# listings/poi_index.py
+"""
+Offline spatial index of schools and grocery stores.
+
+``manage.py build_poi_index`` turns a CSV/GeoJSON dump of POIs into a set
+of .npy arrays laid out as a uniform lat/lng grid (POIs sorted by cell,
+plus a CSR-style offset array per cell). The arrays are opened with
+mmap_mode='r', so every gunicorn worker on the box shares one copy through
+the page cache, and a radius query only touches the handful of cells
+around the point.
+
+When no index has been built, property_detail falls back to the Places
+API (listings/places.py). NumPy is imported only when an index is built
+or opened, so the site runs without it until one exists.
+"""
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+
+from django.conf import settings
+
+from .geo import KM_TO_MILES, bounding_box, haversine_km, rank
+
+CATEGORIES = ('school', 'grocery')
+
+META_FILE = 'meta.json'
+ARRAY_FILES = ('coords', 'ratings', 'categories', 'cell_start')
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class PoiIndex:
+    def __init__(self, path):
+        import numpy as np
+
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        self.origin_lat = meta['origin_lat']
+        self.origin_lng = meta['origin_lng']
+        self.cell_size = meta['cell_size']
+        self.n_rows = meta['n_rows']
+        self.n_cols = meta['n_cols']
+        # Names/addresses are small enough to keep as plain Python lists
+        self.names = meta['names']
+        self.vicinities = meta['vicinities']
+        self.place_ids = meta['place_ids']
+
+        arrays = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+            for name in ARRAY_FILES
+        }
+        self.coords = arrays['coords']          # (N, 2) float64 lat, lng
+        self.ratings = arrays['ratings']        # (N,) float32, NaN = unrated
+        self.categories = arrays['categories']  # (N,) uint8 index into CATEGORIES
+        self.cell_start = arrays['cell_start']  # (n_rows * n_cols + 1,) int64
+
+    def __len__(self):
+        return len(self.names)
+
+    def _candidates(self, lat, lng, radius_km):
+        """Indexes of POIs in the grid cells overlapping the search box"""
+        import numpy as np
+
+        south, west, north, east = bounding_box(lat, lng, radius_km)
+        row0 = max(int((south - self.origin_lat) // self.cell_size), 0)
+        row1 = min(int((north - self.origin_lat) // self.cell_size), self.n_rows - 1)
+        col0 = max(int((west - self.origin_lng) // self.cell_size), 0)
+        col1 = min(int((east - self.origin_lng) // self.cell_size), self.n_cols - 1)
+        if row0 > row1 or col0 > col1:
+            return np.empty(0, dtype=np.int64)
+
+        # Cells in one grid row are contiguous, so each row is one slice
+        ranges = []
+        for row in range(row0, row1 + 1):
+            start = self.cell_start[row * self.n_cols + col0]
+            end = self.cell_start[row * self.n_cols + col1 + 1]
+            if end > start:
+                ranges.append(np.arange(start, end))
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(ranges)
+
+    def query(self, lat, lng, category, radius_km=5.0, limit=None):
+        """
+        POIs of a category within radius_km of (lat, lng), nearest first,
+        shaped like Places API results (name, vicinity, rating, geometry,
+        distance_km, distance_miles).
+        """
+        idx = self._candidates(lat, lng, radius_km)
+        if idx.size:
+            idx = idx[self.categories[idx] == CATEGORIES.index(category)]
+        if not idx.size:
+            return []
+
+        points = self.coords[idx]
+        distances = haversine_km(lat, lng, points[:, 0], points[:, 1])
+        order = rank(distances, limit=limit, max_km=radius_km)
+
+        results = []
+        for i in order:
+            poi = int(idx[i])
+            distance = float(distances[i])
+            place = {
+                'place_id': self.place_ids[poi],
+                'name': self.names[poi],
+                'vicinity': self.vicinities[poi],
+                'geometry': {'location': {
+                    'lat': float(self.coords[poi, 0]),
+                    'lng': float(self.coords[poi, 1]),
+                }},
+                'distance_km': round(distance, 2),
+                'distance_miles': round(distance * KM_TO_MILES, 2),
+            }
+            rating = float(self.ratings[poi])
+            if not math.isnan(rating):
+                place['rating'] = rating
+            results.append(place)
+        return results
+
+
+def build_index(pois, path, cell_size=0.02):
+    """
+    Write an index for `pois` (dicts with name, category, lat, lng and
+    optional rating, vicinity, place_id) to the directory `path`. The new
+    index replaces any existing one in a single rename.
+    """
+    import numpy as np
+
+    pois = [poi for poi in pois if poi['category'] in CATEGORIES]
+    if not pois:
+        raise ValueError("No school or grocery POIs to index")
+
+    lats = np.array([poi['lat'] for poi in pois], dtype=np.float64)
+    lngs = np.array([poi['lng'] for poi in pois], dtype=np.float64)
+    # One cell of margin: floor(x / cell_size) * cell_size can land just
+    # above x in floating point, which would put the southernmost or
+    # westernmost POI in row/column -1
+    origin_lat = (math.floor(lats.min() / cell_size) - 1) * cell_size
+    origin_lng = (math.floor(lngs.min() / cell_size) - 1) * cell_size
+    rows = np.clip((lats - origin_lat) // cell_size, 0, None).astype(np.int64)
+    cols = np.clip((lngs - origin_lng) // cell_size, 0, None).astype(np.int64)
+    n_rows, n_cols = int(rows.max()) + 1, int(cols.max()) + 1
+
+    cell_ids = rows * n_cols + cols
+    order = np.argsort(cell_ids, kind='stable')
+    cell_start = np.searchsorted(cell_ids[order], np.arange(n_rows * n_cols + 1)).astype(np.int64)
+
+    ratings = np.array(
+        [poi.get('rating') if poi.get('rating') is not None else np.nan for poi in pois],
+        dtype=np.float32,
+    )
+    categories = np.array([CATEGORIES.index(poi['category']) for poi in pois], dtype=np.uint8)
+    arrays = {
+        'coords': np.column_stack([lats, lngs])[order],
+        'ratings': ratings[order],
+        'categories': categories[order],
+        'cell_start': cell_start,
+    }
+    meta = {
+        'origin_lat': origin_lat,
+        'origin_lng': origin_lng,
+        'cell_size': cell_size,
+        'n_rows': n_rows,
+        'n_cols': n_cols,
+        'names': [pois[i]['name'] for i in order],
+        'vicinities': [pois[i].get('vicinity', '') for i in order],
+        'place_ids': [pois[i].get('place_id', '') for i in order],
+    }
+
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.poi_index-', dir=parent)
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(array))
+    with open(os.path.join(staging, META_FILE), 'w') as f:
+        json.dump(meta, f)
+
+    # Swap directories so running workers never see a half-written index
+    if os.path.exists(path):
+        retired = f'{path}.old'
+        shutil.rmtree(retired, ignore_errors=True)
+        os.rename(path, retired)
+        os.rename(staging, path)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.rename(staging, path)
+    return len(pois)
+
+
+def get_poi_index():
+    """The process-wide index, or None if none has been built"""
+    global _index
+    if _index is None:
+        path = settings.POI_INDEX_DIR
+        if not os.path.exists(os.path.join(path, META_FILE)):
+            return None
+        with _index_lock:
+            if _index is None:
+                _index = PoiIndex(path)
+    return _index
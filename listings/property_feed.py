@@ -0,0 +1,61 @@
+# listings/property_feed.py
+"""
+In-process cache of listings/properties.json.
+
+The feed is parsed once per worker and indexed by id, with image paths
+normalized up front. Each lookup stats the file and re-parses only when
+its mtime or size has changed, so edits still show up without a restart.
+Returned dicts are shared between requests: treat them as read-only.
+"""
+import json
+import os
+import threading
+
+PROPERTIES_JSON = os.path.join(os.path.dirname(__file__), 'properties.json')
+
+
+def normalize_images(images):
+    """Image list as relative static paths, whatever shape the feed used"""
+    if isinstance(images, str):
+        try:
+            images = json.loads(images)
+        except ValueError:
+            images = [images]
+    return [img[1:] if img.startswith('/') else img for img in images or []]
+
+
+class PropertyFeed:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._properties = []
+        self._by_id = {}
+
+    def _load(self):
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            with open(self.path, 'r') as file:
+                properties = json.load(file)
+            for prop in properties:
+                prop['images'] = normalize_images(prop.get('images', []))
+            self._properties = properties
+            self._by_id = {prop['id']: prop for prop in properties}
+            self._signature = signature
+
+    def all(self):
+        self._load()
+        return self._properties
+
+    def get(self, pk):
+        """The property with this id, or None"""
+        self._load()
+        return self._by_id.get(pk)
+
+
+property_feed = PropertyFeed(PROPERTIES_JSON)
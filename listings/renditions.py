@@ -0,0 +1,201 @@
+# listings/renditions.py
+"""
+Resized copies of uploaded property photos.
+
+Every uploaded Listing.main_image / ListingImage.image gets a fixed set of
+widths in WebP and JPEG. Generation runs on a small thread pool after the
+upload's transaction commits, so saving in the admin never waits on Pillow.
+Renditions go away with their image, whether it is deleted or replaced.
+Templates pick the renditions up through the ``listing_images`` tags.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from .models import ImageRendition
+
+logger = logging.getLogger(__name__)
+
+# Rendition name -> target width in pixels
+RENDITION_WIDTHS = {
+    'thumb': 160,
+    'card': 600,
+    'gallery': 1200,
+    'hero': 1920,
+}
+
+# Output format -> (Pillow format, file extension, save options)
+RENDITION_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+RENDITION_ROOT = 'renditions'
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'RENDITION_WORKERS', 2),
+            thread_name_prefix='renditions',
+        )
+    return _executor
+
+
+def _cache_key(source_name):
+    return f'listings:renditions:{source_name}'
+
+
+def rendition_name(source_name, size, fmt):
+    """Storage path of one rendition of a source image"""
+    # The source extension stays in the stem, so house.jpg and house.png in
+    # the same upload directory never share (and overwrite) a rendition
+    extension = RENDITION_FORMATS[fmt][1]
+    return f'{RENDITION_ROOT}/{size}/{source_name}.{extension}'
+
+
+def generate_renditions(source_name, force=False):
+    """Create every missing rendition of a stored image and record it"""
+    existing = set(
+        ImageRendition.objects.filter(source_name=source_name)
+        .values_list('size', 'format')
+    )
+    wanted = [
+        (size, fmt)
+        for size in RENDITION_WIDTHS
+        for fmt in RENDITION_FORMATS
+        if force or (size, fmt) not in existing
+    ]
+    if not wanted:
+        return 0
+
+    with default_storage.open(source_name, 'rb') as source:
+        original = Image.open(source)
+        original = ImageOps.exif_transpose(original)
+        original = original.convert('RGB')
+        original.load()
+
+    created = 0
+    for size, fmt in wanted:
+        image = original.copy()
+        # Never upscale: small uploads just get re-encoded at their own width
+        target_width = min(RENDITION_WIDTHS[size], image.width)
+        target_height = round(image.height * target_width / image.width)
+        image = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+
+        pil_format, _, options = RENDITION_FORMATS[fmt]
+        buffer = BytesIO()
+        image.save(buffer, pil_format, **options)
+
+        name = rendition_name(source_name, size, fmt)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        name = default_storage.save(name, ContentFile(buffer.getvalue()))
+
+        ImageRendition.objects.update_or_create(
+            source_name=source_name,
+            size=size,
+            format=fmt,
+            defaults={
+                'file': name,
+                'width': target_width,
+                'height': target_height,
+                'file_size': buffer.tell(),
+            },
+        )
+        created += 1
+
+    cache.delete(_cache_key(source_name))
+    return created
+
+
+def _generate_in_background(source_name):
+    try:
+        generate_renditions(source_name)
+    except Exception:
+        logger.exception("Could not generate renditions for %s", source_name)
+    finally:
+        # Worker threads get their own connections; don't leak them
+        connections.close_all()
+
+
+def schedule_renditions(source_name):
+    """Queue rendition generation once the current transaction commits"""
+    if not source_name:
+        return
+    transaction.on_commit(
+        lambda: _get_executor().submit(_generate_in_background, source_name)
+    )
+
+
+def delete_renditions(*source_names):
+    """
+    Remove every rendition of the given source images: the rows now, the
+    files and the cached lookups once the current transaction commits.
+    """
+    source_names = [name for name in source_names if name]
+    if not source_names:
+        return
+    renditions = ImageRendition.objects.filter(source_name__in=source_names)
+    names = list(renditions.values_list('file', flat=True))
+    renditions.delete()
+
+    def remove_files():
+        for name in names:
+            default_storage.delete(name)
+        cache.delete_many([_cache_key(source_name) for source_name in source_names])
+
+    transaction.on_commit(remove_files)
+
+
+def get_renditions(source_name):
+    """
+    Renditions of a source image as {(size, format): (url, width)}.
+    Cached so templates don't query once per image.
+    """
+    key = _cache_key(source_name)
+    renditions = cache.get(key)
+    if renditions is None:
+        renditions = {
+            (size, fmt): (default_storage.url(name), width)
+            for size, fmt, name, width in (
+                ImageRendition.objects.filter(source_name=source_name)
+                .values_list('size', 'format', 'file', 'width')
+            )
+        }
+        # Missing renditions may still be on the way, so re-check soon
+        cache.set(key, renditions, None if renditions else 60)
+    return renditions
+
+
+def get_srcset(renditions, fmt):
+    """srcset value for one format of get_renditions(), or '' if there is none"""
+    candidates = sorted(
+        (width, url)
+        for (size, rendition_fmt), (url, width) in renditions.items()
+        if rendition_fmt == fmt
+    )
+    entries = []
+    seen_widths = set()
+    for width, url in candidates:
+        # Small originals produce several renditions of the same width
+        if width not in seen_widths:
+            seen_widths.add(width)
+            entries.append(f'{url} {width}w')
+    return ', '.join(entries)
+
+
+def get_rendition_url(renditions, size, fmt='jpeg'):
+    """URL of one rendition from get_renditions(), or None if it doesn't exist yet"""
+    rendition = renditions.get((size, fmt))
+    return rendition[0] if rendition else None
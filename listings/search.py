@@ -0,0 +1,230 @@
+# listings/search.py
+"""
+Keyword search over listings.
+
+On PostgreSQL this uses the trigger-maintained Listing.search_vector (GIN
+indexed, title weighted above address above description), ranks matches
+with SearchRank and adds a highlighted ``headline`` snippet. Other backends
+fall back to the old icontains matching so the SQLite backup still works.
+
+Radius/box searches prefilter on the indexed (latitude, longitude) columns
+in SQL, then compute exact distances for the survivors in one vectorized
+pass (listings/geo.py). Only the ids are ordered in Python; the rows for a
+page are loaded when the page is sliced.
+
+The ordered id list of a search is cached per normalized filter signature
+under the LISTING_CONTENT version, which every Listing write bumps. A
+repeated search skips filtering and sorting entirely and only loads the
+rows of the requested page. Searches matching more than
+SEARCH_RESULT_CACHE_MAX_IDS listings aren't cached; they page straight
+through the queryset (COUNT plus LIMIT/OFFSET) instead.
+"""
+import hashlib
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Q
+
+from .caching import LISTING_CONTENT, versioned_key
+from .cards import ListingCard, card_queryset, get_cards
+from .geo import KM_TO_MILES, bounding_box, haversine_km, rank
+
+SEARCH_CONFIG = 'english'
+
+
+def full_text_search_available():
+    return connection.vendor == 'postgresql'
+
+
+def search_signature(cleaned_data, exclude=()):
+    """
+    Stable hash of a search form's filters, so equivalent searches (case,
+    spacing, 250000 vs 250000.00) share cache entries.
+    """
+    normalized = {}
+    for name, value in cleaned_data.items():
+        if name in exclude or value in (None, ''):
+            continue
+        if isinstance(value, str):
+            value = ' '.join(value.lower().split())
+        elif isinstance(value, Decimal):
+            value = format(value.normalize(), 'f')
+        normalized[name] = value
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def search_listings(queryset, q):
+    """
+    Filter a Listing queryset down to matches for a user query, best
+    matches first.
+    """
+    if not full_text_search_available():
+        return queryset.filter(
+            Q(title__icontains=q) |
+            Q(description__icontains=q) |
+            Q(address__icontains=q)
+        ).order_by('-created_at')
+
+    query = SearchQuery(q, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query),
+        headline=SearchHeadline(
+            'description',
+            query,
+            config=SEARCH_CONFIG,
+            start_sel='<mark>',
+            stop_sel='</mark>',
+            max_words=30,
+            min_words=15,
+        ),
+    ).order_by('-rank', '-created_at')
+
+
+class OrderedResults:
+    """
+    Ordered listing ids from a search. Works with Paginator: slicing loads
+    just those listings from the filtered queryset, as ListingCards with
+    distance_km / distance_mi set when a geo search had a centre point.
+    """
+
+    def __init__(self, queryset, ids, distances=None):
+        self.queryset = queryset
+        self.ids = ids
+        self.distances = distances
+
+    def count(self):
+        return len(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        ids = self.ids[index] if isinstance(index, slice) else [self.ids[index]]
+        listings = {card.id: card for card in get_cards(self.queryset.order_by().filter(pk__in=ids))}
+        results = []
+        for pk in ids:
+            listing = listings.get(pk)
+            if listing is None:  # deleted since the search ran
+                continue
+            if self.distances is not None:
+                listing.distance_km = round(self.distances[pk], 2)
+                listing.distance_mi = round(self.distances[pk] * KM_TO_MILES, 2)
+            results.append(listing)
+        return results if isinstance(index, slice) else results[0]
+
+
+class QuerysetResults:
+    """
+    Paginator-compatible ListingCards read straight from a queryset, for
+    results too broad to cache as an id list
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def count(self):
+        return self.queryset.count()
+
+    def __getitem__(self, index):
+        rows = card_queryset(self.queryset)[index]
+        if isinstance(index, slice):
+            return [ListingCard(row) for row in rows]
+        return ListingCard(rows)
+
+
+def geo_search(queryset, lat=None, lng=None, radius_km=None, bbox=None,
+               sort_by_distance=False):
+    """
+    Narrow a Listing queryset to a radius around (lat, lng) and/or a
+    (south, west, north, east) box. Keeps the queryset's order unless
+    sort_by_distance is set.
+    """
+    box = bbox
+    if radius_km is not None:
+        box = bounding_box(lat, lng, radius_km)
+        if bbox is not None:
+            box = (max(box[0], bbox[0]), max(box[1], bbox[1]),
+                   min(box[2], bbox[2]), min(box[3], bbox[3]))
+
+    queryset = queryset.filter(latitude__isnull=False, longitude__isnull=False)
+    candidates = queryset
+    if box is not None:
+        south, west, north, east = box
+        candidates = candidates.filter(
+            latitude__range=(south, north), longitude__range=(west, east)
+        )
+    rows = list(candidates.values_list('pk', 'latitude', 'longitude'))
+
+    if lat is None or lng is None:
+        return OrderedResults(queryset, [row[0] for row in rows])
+
+    distances = haversine_km(lat, lng, [row[1] for row in rows], [row[2] for row in rows])
+    if sort_by_distance:
+        order = rank(distances, max_km=radius_km)
+    else:
+        order = [i for i in range(len(rows)) if radius_km is None or distances[i] <= radius_km]
+    return OrderedResults(
+        queryset,
+        [rows[i][0] for i in order],
+        {rows[i][0]: float(distances[i]) for i in order},
+    )
+
+
+def _stats_key(name):
+    return f'listings:search-cache:{name}'
+
+
+def _count(name):
+    key = _stats_key(name)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def search_cache_stats():
+    """Hit/miss counters of the search result cache"""
+    hits = cache.get(_stats_key('hits'), 0)
+    misses = cache.get(_stats_key('misses'), 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 3) if lookups else None,
+    }
+
+
+def cached_search_results(queryset, signature, geo=None):
+    """
+    The ordered ids of `queryset` (narrowed by geo_search(**geo) if given)
+    as OrderedResults, cached under the search's signature; QuerysetResults
+    for non-geo searches too broad to cache.
+    """
+    key = versioned_key(LISTING_CONTENT, 'search', signature)
+    cached = cache.get(key)
+    if cached is not None:
+        _count('hits')
+        ids, distances = cached
+        return OrderedResults(queryset, ids, distances)
+
+    _count('misses')
+    max_ids = settings.SEARCH_RESULT_CACHE_MAX_IDS
+    if geo is not None:
+        results = geo_search(queryset, **geo)
+        if len(results.ids) > max_ids:
+            return results
+    else:
+        # Read at most one id past the cap; broader searches page through
+        # the queryset rather than loading every matching id
+        ids = list(queryset.values_list('pk', flat=True)[:max_ids + 1])
+        if len(ids) > max_ids:
+            return QuerysetResults(queryset)
+        results = OrderedResults(queryset, ids)
+    cache.set(key, (results.ids, results.distances), settings.SEARCH_RESULT_CACHE_TIMEOUT)
+    return results
@@ -0,0 +1,162 @@
+# listings/signals.py
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import clustering
+from .caching import HOME_CONTENT, LISTING_CONTENT, bump_content_version
+from .lead_stats import invalidate_lead_stats
+from .renditions import delete_renditions, schedule_renditions
+from .models import (AgentProfile, Listing, ListingImage, PropertyInterest, Review,
+                     ReviewStats, SectionContent)
+
+
+# ============ HOME PAGE CACHE INVALIDATION ============
+@receiver(post_save, sender=Listing)
+@receiver(post_delete, sender=Listing)
+@receiver(post_save, sender=ListingImage)
+@receiver(post_delete, sender=ListingImage)
+@receiver(post_save, sender=AgentProfile)
+@receiver(post_delete, sender=AgentProfile)
+@receiver(post_save, sender=SectionContent)
+@receiver(post_delete, sender=SectionContent)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_home_content(sender, **kwargs):
+    """Any change to home page content makes the cached page stale"""
+    bump_content_version(HOME_CONTENT)
+
+
+@receiver(post_save, sender=Listing)
+@receiver(post_delete, sender=Listing)
+def invalidate_listing_content(sender, **kwargs):
+    """Cached search facets and results depend on every listing"""
+    bump_content_version(LISTING_CONTENT)
+
+
+@receiver(post_save, sender=PropertyInterest)
+def invalidate_lead_content(sender, **kwargs):
+    """
+    Lead dashboard counters depend on every interest. Deletes call
+    invalidate_lead_stats() themselves: a post_delete receiver would stop
+    QuerySet.delete() from deleting leads in one statement.
+    """
+    invalidate_lead_stats()
+
+
+# ============ MAP CLUSTER INVALIDATION ============
+@receiver(post_save, sender=Listing)
+def invalidate_listing_clusters(sender, instance, created, raw=False, **kwargs):
+    """Drop cached cluster tiles when an active listing moves, reprices or changes status"""
+    if raw:
+        return
+    old = getattr(instance, '_loaded_cluster_state', None)
+    new = instance.get_cluster_state()
+    instance._loaded_cluster_state = new
+    if old == new:
+        return
+    if old is None and not created:
+        # Loaded without the cluster fields; we can't tell which tiles it left
+        clustering.invalidate_all()
+        return
+
+    status, latitude, longitude = new[0], new[2], new[3]
+    if status == 'active':
+        clustering.invalidate_point(latitude, longitude)
+    if old is not None and old[0] == 'active':
+        moved = (old[2], old[3]) != (latitude, longitude)
+        if moved or status != 'active':
+            # The tile it was on: it moved, or stopped being active in place
+            clustering.invalidate_point(old[2], old[3])
+
+
+@receiver(post_delete, sender=Listing)
+def invalidate_deleted_listing_clusters(sender, instance, **kwargs):
+    if instance.status == 'active':
+        clustering.invalidate_point(instance.latitude, instance.longitude)
+
+
+# ============ LISTING IMAGE SUMMARY ============
+def _deleting_listing(origin):
+    """Whether a delete started from a Listing or a Listing queryset"""
+    return isinstance(origin, Listing) or getattr(origin, 'model', None) is Listing
+
+
+@receiver(post_save, sender=ListingImage)
+@receiver(post_delete, sender=ListingImage)
+def update_listing_image_summary(sender, instance, raw=False, origin=None, **kwargs):
+    """Keep Listing.cover_image and Listing.image_count current"""
+    if raw or _deleting_listing(origin):
+        # Nothing to keep current on a listing that is going too
+        return
+    try:
+        listing = instance.listing
+    except Listing.DoesNotExist:
+        # Deleted concurrently
+        return
+    listing.refresh_image_summary()
+
+
+# ============ IMAGE RENDITIONS ============
+def _update_renditions(instance, image):
+    """Queue renditions of the saved upload and drop those of one it replaced"""
+    replaced = getattr(instance, '_loaded_image', None)
+    instance._loaded_image = image.name
+    if replaced and replaced != image.name:
+        delete_renditions(replaced)
+    if image:
+        schedule_renditions(image.name)
+
+
+@receiver(post_save, sender=Listing)
+def queue_main_image_renditions(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _update_renditions(instance, instance.main_image)
+
+
+@receiver(post_save, sender=ListingImage)
+def queue_additional_image_renditions(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _update_renditions(instance, instance.image)
+
+
+@receiver(pre_delete, sender=Listing)
+def remember_listing_images(sender, instance, **kwargs):
+    # Its images are deleted first; their renditions go in one batch with it
+    instance._image_names = list(instance.additional_images.values_list('image', flat=True))
+
+
+@receiver(post_delete, sender=Listing)
+def delete_listing_renditions(sender, instance, **kwargs):
+    delete_renditions(instance.main_image.name, *getattr(instance, '_image_names', ()))
+
+
+@receiver(post_delete, sender=ListingImage)
+def delete_additional_image_renditions(sender, instance, origin=None, **kwargs):
+    if not _deleting_listing(origin):
+        delete_renditions(instance.image.name)
+
+
+# ============ REVIEW STATISTICS ============
+# The delta is taken against the row as stored at write time (locked in the
+# write's transaction), not as it was when the instance was loaded, so a
+# stale instance or a concurrent ReviewStats.update_reviews() can't skew it
+@receiver(pre_save, sender=Review)
+@receiver(pre_delete, sender=Review)
+def lock_stored_review_stats(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._stored_stats = None if instance._state.adding else instance.get_stored_stats()
+
+
+@receiver(post_save, sender=Review)
+def update_review_stats_on_save(sender, instance, raw=False, **kwargs):
+    """Move the saved review's contribution into ReviewStats"""
+    if raw:
+        return
+    ReviewStats.record_changes([(instance._stored_stats, instance.get_stats_snapshot())])
+
+
+@receiver(post_delete, sender=Review)
+def update_review_stats_on_delete(sender, instance, **kwargs):
+    """Remove the deleted review's contribution from ReviewStats"""
+    ReviewStats.record_changes([(instance._stored_stats, None)])
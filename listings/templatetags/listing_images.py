@@ -0,0 +1,52 @@
+# listings/templatetags/listing_images.py
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from ..renditions import get_rendition_url, get_renditions, get_srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(source_name, sizes='100vw', alt='', css_class='', fallback_url=''):
+    """
+    Render a <picture> with WebP and JPEG srcsets for an uploaded image.
+
+    Usage:
+        {% load listing_images %}
+        {% responsive_image listing.get_first_image_name sizes="(max-width: 768px) 100vw, 400px" alt=listing.title css_class="property-image" %}
+
+    Falls back to the original upload (or fallback_url) until the
+    renditions have been generated.
+    """
+    if not source_name:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy">',
+                           fallback_url, alt, css_class)
+
+    renditions = get_renditions(source_name)
+    webp_srcset = get_srcset(renditions, 'webp')
+    jpeg_srcset = get_srcset(renditions, 'jpeg')
+    if not jpeg_srcset:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy">',
+                           default_storage.url(source_name), alt, css_class)
+
+    src = get_rendition_url(renditions, 'card') or default_storage.url(source_name)
+    img = format_html(
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy">',
+        src, jpeg_srcset, sizes, alt, css_class,
+    )
+    if not webp_srcset:
+        return img
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">{}</picture>',
+        webp_srcset, sizes, img,
+    )
+
+
+@register.simple_tag
+def rendition_url(source_name, size='thumb'):
+    """URL of one JPEG rendition, falling back to the original upload"""
+    if not source_name:
+        return ''
+    return get_rendition_url(get_renditions(source_name), size) or default_storage.url(source_name)
@@ -1,3 +1,360 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from unittest import skipUnless
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import geocoding, renditions
+from .google_client import CircuitBreaker, CircuitOpenError, GoogleApiClient, GoogleApiError
+from .models import ImageRendition, Listing, ListingImage, Review, ReviewStats
+from .templatetags.listing_images import responsive_image
+
+try:
+    import numpy
+except ImportError:  # optional; see listings/geo.py
+    numpy = None
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@skipUnless(numpy, "numpy is not installed")
+class PoiIndexTests(SimpleTestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.path = os.path.join(root, 'poi_index')
+
+    def build(self, pois, **kwargs):
+        from .poi_index import PoiIndex, build_index
+        build_index(pois, self.path, **kwargs)
+        return PoiIndex(self.path)
+
+    def test_finds_poi_at_minimum_latitude(self):
+        # 29.06 / 0.02 floors to a grid origin just above 29.06 in floating
+        # point, which used to drop this POI into row -1
+        index = self.build([
+            {'name': 'South School', 'category': 'school', 'lat': 29.06, 'lng': -97.7},
+            {'name': 'North School', 'category': 'school', 'lat': 29.3, 'lng': -97.5},
+        ], cell_size=0.02)
+
+        results = index.query(29.06, -97.7, 'school', radius_km=1)
+
+        self.assertEqual([place['name'] for place in results], ['South School'])
+        self.assertEqual(results[0]['distance_km'], 0)
+
+
+@skipUnless(connection.vendor == 'postgresql', "EXPLAIN plans are checked on PostgreSQL")
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        # Raises CommandError on a sequential scan of a hot table or when a
+        # query stops using an index listed in listings/query_plans.json
+        call_command('check_query_plans', rows=2000, stdout=StringIO())
+
+
+@skipUnless(numpy, "numpy is not installed")
+@override_settings(CACHES=LOCMEM_CACHES)
+class ClusterInvalidationTests(TestCase):
+    BBOX = (30.9, -97.9, 31.1, -97.5)
+
+    def test_listing_leaves_clusters_when_deactivated_in_place(self):
+        from .clustering import get_clusters
+        listing = Listing.objects.create(status='active', latitude=31.0, longitude=-97.7)
+        self.assertEqual(sum(c['count'] for c in get_clusters(self.BBOX, 12)), 1)
+
+        listing = Listing.objects.get(pk=listing.pk)
+        listing.status = 'inactive'
+        listing.save()
+
+        self.assertEqual(get_clusters(self.BBOX, 12), [])
+
+
+class ReviewStatsTests(TestCase):
+    STAT_FIELDS = ('total_count', 'approved_count', 'featured_count', 'featured_total_count',
+                   'rating_sum', 'rating_histogram', 'category_counts')
+
+    def assertStatsMatchTable(self):
+        stats = ReviewStats.get_solo()
+        running = {field: getattr(stats, field) for field in self.STAT_FIELDS}
+        rebuilt = ReviewStats.rebuild()
+        self.assertEqual(running, {field: getattr(rebuilt, field) for field in self.STAT_FIELDS})
+
+    def test_stale_instance_saved_after_queryset_update(self):
+        review = Review.objects.create(name="A", comment="Great", rating=5, featured=True)
+        stale = Review.objects.get(pk=review.pk)
+        ReviewStats.update_reviews(Review.objects.filter(pk=review.pk), is_approved=True)
+
+        # Writes is_approved=False back over the update
+        stale.rating = 4
+        stale.save()
+
+        self.assertStatsMatchTable()
+
+    def test_delete_of_stale_instance(self):
+        review = Review.objects.create(name="B", comment="Fine", rating=3)
+        stale = Review.objects.get(pk=review.pk)
+        ReviewStats.update_reviews(Review.objects.filter(pk=review.pk), is_approved=True)
+
+        stale.delete()
+
+        self.assertStatsMatchTable()
+
+
+class StubGoogleApi:
+    """
+    Maps web services stand-in on a local port. `respond(query)` returns
+    (http_status, json_body) for each GET; requests are logged with their
+    arrival time.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                stub.requests.append((time.monotonic(), query))
+                status, body = stub.respond(query)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def replies(*responses):
+    """A respond() giving each response in turn, then repeating the last"""
+    queue = list(responses)
+    return lambda query: queue.pop(0) if len(queue) > 1 else queue[0]
+
+
+OK = (200, {'status': 'OK', 'results': []})
+OVER_QUERY_LIMIT = (200, {'status': 'OVER_QUERY_LIMIT', 'results': []})
+SERVER_ERROR = (500, {})
+
+
+class GoogleApiClientTests(SimpleTestCase):
+    def client_for(self, *responses, **kwargs):
+        self.stub = StubGoogleApi(replies(*responses))
+        self.addCleanup(self.stub.close)
+        kwargs.setdefault('backoff_factor', 0.05)
+        return GoogleApiClient(self.stub.url, 'test-key', **kwargs)
+
+    def test_5xx_is_retried(self):
+        client = self.client_for(SERVER_ERROR, SERVER_ERROR, OK)
+        self.assertEqual(client.get_json('geocode/json', {'address': 'x'})['status'], 'OK')
+        self.assertEqual(len(self.stub.requests), 3)
+        self.assertEqual(client.breaker.total_failures, 0)
+
+    def test_5xx_after_retries_fails_without_leaking_the_key(self):
+        client = self.client_for(SERVER_ERROR)
+        with self.assertRaises(GoogleApiError) as raised:
+            client.get_json('geocode/json', {'address': 'x'})
+        self.assertEqual(len(self.stub.requests), 3)
+        self.assertEqual(self.stub.requests[0][1]['key'], 'test-key')
+        self.assertNotIn('test-key', str(raised.exception))
+        self.assertIsNone(raised.exception.__cause__)
+        self.assertEqual(client.breaker.total_failures, 1)
+
+    def test_over_query_limit_backs_off_exponentially(self):
+        client = self.client_for(OVER_QUERY_LIMIT, OVER_QUERY_LIMIT, OK)
+        self.assertEqual(client.get_json('geocode/json', {'address': 'x'})['status'], 'OK')
+        times = [arrived for arrived, _ in self.stub.requests]
+        self.assertEqual(len(times), 3)
+        self.assertGreaterEqual(times[1] - times[0], 0.05)
+        self.assertGreaterEqual(times[2] - times[1], 0.1)
+
+    def test_over_query_limit_after_retries_fails(self):
+        client = self.client_for(OVER_QUERY_LIMIT)
+        with self.assertRaisesMessage(GoogleApiError, 'OVER_QUERY_LIMIT'):
+            client.get_json('geocode/json', {'address': 'x'})
+        self.assertEqual(len(self.stub.requests), 3)
+
+    def test_breaker_opens_then_half_opens_then_closes(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=lambda: now[0])
+        client = self.client_for(SERVER_ERROR, SERVER_ERROR, OK, max_retries=0, breaker=breaker)
+
+        with self.assertLogs('listings.google_client', 'WARNING'):
+            for _ in range(2):
+                with self.assertRaises(GoogleApiError):
+                    client.get_json('geocode/json', {'address': 'x'})
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            client.get_json('geocode/json', {'address': 'x'})
+        self.assertEqual(len(self.stub.requests), 2)
+
+        now[0] = 30
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertLogs('listings.google_client', 'INFO') as logs:
+            self.assertEqual(client.get_json('geocode/json', {'address': 'x'})['status'], 'OK')
+        self.assertIn('circuit closed', logs.output[0])
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.metrics()['total_rejected'], 1)
+
+    def test_failed_half_open_trial_reopens(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=lambda: now[0])
+        client = self.client_for(SERVER_ERROR, max_retries=0, breaker=breaker)
+        with self.assertLogs('listings.google_client', 'WARNING'):
+            with self.assertRaises(GoogleApiError):
+                client.get_json('geocode/json', {'address': 'x'})
+
+            now[0] = 30
+            with self.assertRaises(GoogleApiError):
+                client.get_json('geocode/json', {'address': 'x'})
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            client.get_json('geocode/json', {'address': 'x'})
+        self.assertEqual(len(self.stub.requests), 2)
+
+
+# Worker threads write GeocodeCache rows on their own connections
+@override_settings(CACHES=LOCMEM_CACHES)
+class GeocodeListingsTests(TransactionTestCase):
+    def setUp(self):
+        self.stub = StubGoogleApi(self.geocode)
+        self.addCleanup(self.stub.close)
+        stub_api = override_settings(GOOGLE_MAPS_API_BASE_URL=self.stub.url,
+                                     GOOGLE_MAPS_API_KEY='test-key')
+        stub_api.enable()
+        self.addCleanup(stub_api.disable)
+        geocoding._lru.clear()
+        self.addCleanup(geocoding._lru.clear)
+
+    @staticmethod
+    def geocode(query):
+        # "<n> Main St, ..." -> a point that encodes n
+        number = int(query['address'].split()[0])
+        return 200, {'status': 'OK', 'results': [
+            {'geometry': {'location': {'lat': 31 + number / 100, 'lng': -97.7}}},
+        ]}
+
+    def geocoded_addresses(self):
+        return [query['address'] for _, query in self.stub.requests]
+
+    def test_rate_limited_and_resumable(self):
+        for number in range(5):
+            Listing.objects.create(title=f"Listing {number}", address=f"{number} Main St",
+                                   city="Killeen", state="TX", zip_code="76541")
+
+        # An interrupted run: three listings, two batches
+        call_command('geocode_listings', workers=3, qps=10, batch_size=2, limit=3,
+                     stdout=StringIO())
+        first_run = self.geocoded_addresses()
+        self.assertEqual(len(first_run), 3)
+        self.assertEqual(Listing.objects.filter(latitude__isnull=True).count(), 2)
+        times = sorted(arrived for arrived, _ in self.stub.requests)
+        # Three workers would send all three at once; 10 QPS spaces them 0.1s apart
+        self.assertGreaterEqual(times[-1] - times[0], 0.18)
+
+        call_command('geocode_listings', workers=3, qps=10, stdout=StringIO())
+        addresses = self.geocoded_addresses()
+        self.assertEqual(len(addresses), 5)
+        self.assertEqual(len(set(addresses)), 5)
+        for listing in Listing.objects.all():
+            number = int(listing.address.split()[0])
+            self.assertAlmostEqual(listing.latitude, 31 + number / 100)
+
+
+def jpeg_upload(name):
+    from PIL import Image
+    buffer = BytesIO()
+    Image.new('RGB', (40, 30), 'navy').save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+# Renditions are generated by a thread pool on commit, on its own connections
+@override_settings(CACHES=LOCMEM_CACHES)
+class RenditionCleanupTests(TransactionTestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        media_root = override_settings(MEDIA_ROOT=media)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+    def wait_for_renditions(self):
+        if renditions._executor is not None:
+            renditions._executor.shutdown(wait=True)
+            renditions._executor = None
+
+    def rendition_files(self, source_name):
+        self.wait_for_renditions()
+        files = list(ImageRendition.objects.filter(source_name=source_name)
+                     .values_list('file', flat=True))
+        self.assertTrue(all(default_storage.exists(name) for name in files))
+        return files
+
+    def test_renditions_follow_their_image(self):
+        listing = Listing.objects.create(title="Photos", main_image=jpeg_upload('front.jpg'))
+        old_name = listing.main_image.name
+        old_files = self.rendition_files(old_name)
+        self.assertEqual(len(old_files), 8)
+        self.assertIn('<picture>', responsive_image(old_name))
+
+        listing = Listing.objects.get(pk=listing.pk)
+        listing.main_image = jpeg_upload('back.jpg')
+        listing.save()
+        self.assertEqual(self.rendition_files(old_name), [])
+        self.assertFalse(any(default_storage.exists(name) for name in old_files))
+        self.assertNotIn('<picture>', responsive_image(old_name))
+        self.assertEqual(len(self.rendition_files(listing.main_image.name)), 8)
+
+        image = ListingImage.objects.create(listing=listing, image=jpeg_upload('yard.jpg'))
+        image_files = self.rendition_files(image.image.name)
+        self.assertEqual(len(image_files), 8)
+        image.delete()
+        self.assertEqual(self.rendition_files(image.image.name), [])
+        self.assertFalse(any(default_storage.exists(name) for name in image_files))
+
+        main_name = listing.main_image.name
+        listing.delete()
+        self.assertEqual(self.rendition_files(main_name), [])
+
+
+class ListingDeleteTests(TestCase):
+    def delete_with_images(self, count):
+        listing = Listing.objects.create(title="Going", main_image='properties/main/going.jpg')
+        names = [listing.main_image.name]
+        for i in range(count):
+            names.append(ListingImage.objects.create(
+                listing=listing, image=f'properties/additional/going-{i}.jpg').image.name)
+        ImageRendition.objects.bulk_create([
+            ImageRendition(source_name=name, size='thumb', format='jpeg',
+                           file=f'renditions/thumb/{name}.jpg', width=160, height=120, file_size=1)
+            for name in names
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            listing.delete()
+        self.assertFalse(ImageRendition.objects.filter(source_name__in=names).exists())
+        return len(queries)
+
+    def test_images_do_not_add_queries(self):
+        # No image summary refresh or rendition cleanup per image
+        self.assertEqual(self.delete_with_images(1), self.delete_with_images(5))
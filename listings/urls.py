@@ -21,6 +21,8 @@ urlpatterns = [
     path('listing/<int:pk>/', views.property_detail, name='property_detail'),
     path('contact/', views.contact_view, name='contact'),
     path('search/', views.search, name='search'),
+    path('search/api/', views.search_api, name='search_api'),
+    path('listings/clusters/', views.listing_clusters, name='listing_clusters'),
     path("proprty_list/", views.property_list, name="property_list"),
     path('killeen/', views.killeen, name='killeen'),
     path('save-interest/', views.save_property_interest, name='save_interest'),
@@ -47,6 +49,14 @@ urlpatterns = [
          user_passes_test(is_staff_user, login_url='listings:login')(admin_dashboard), 
          name='admin_dashboard'),
     
+    path('admin-dashboard/google-api/', 
+         user_passes_test(is_staff_user, login_url='listings:login')(views.google_api_status), 
+         name='google_api_status'),
+    
+    path('admin-dashboard/search-cache/', 
+         user_passes_test(is_staff_user, login_url='listings:login')(views.search_cache_status), 
+         name='search_cache_status'),
+    
     # Interest management URLs (Admin only)
     path('interest-dashboard/', 
          user_passes_test(is_staff_user, login_url='listings:login')(views.interest_dashboard), 
@@ -1,10 +1,8 @@
 # Standard library imports
 import json
-import math
-import os
+import time
 
 # Third-party imports
-import requests
 from formtools.wizard.views import SessionWizardView
 from twilio.rest import Client
 
@@ -16,7 +14,7 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.core.mail import BadHeaderError, send_mail
 from django.core.paginator import Paginator
-from django.db.models import Avg, Count, Q
+from django.db import transaction
 from django.http import (Http404, HttpResponse, HttpResponseForbidden,
                          JsonResponse)
 from django.shortcuts import get_object_or_404, redirect, render
@@ -24,46 +22,76 @@ from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 
 # Local imports
-from .forms import (ContactForm, ListingSearchForm, ReviewForm, Step1Form,
-                    Step2Form, Step3Form, Step4Form)
-from .models import (AgentProfile, Listing, PropertyInterest, Review,
-                     SectionContent, User)
+from .caching import HOME_CONTENT, get_content_version, get_or_build
+from .cards import ListingCard, card_model_queryset, get_cards
+from .clustering import get_clusters
+from .forms import (ContactForm, ListingSearchForm, MapClusterForm, ReviewForm,
+                    Step1Form, Step2Form, Step3Form, Step4Form)
+from .facets import get_facets
+from .geo import KM_TO_MILES, rank_places
+from .geocoding import get_coordinates
+from .google_client import google_client
+from .lead_stats import get_lead_stats, invalidate_lead_stats
+from .models import (AgentProfile, InterestNote, Listing, PropertyInterest,
+                     Review, ReviewStats, SectionContent, User)
+from .pagination import CursorPage, CursorPaginator
+from .places import (SEARCH_RADIUS_M, call_with_timeout,
+                     get_nearby_places_concurrently)
+from .poi_index import get_poi_index
+from .property_feed import property_feed
+from .search import (cached_search_results, full_text_search_available,
+                     search_cache_stats, search_listings, search_signature)
 
 
 # ============ HOME VIEW ============
-def home(request):
-    """Home page view with featured listings and reviews"""
-    # Get 4 featured or active listings (prioritize featured ones)
-    # featured_listings = Listing.objects.filter(
-    #     status='active', 
-    #     featured=True
-    # ).order_by('-created_at')[:4]
-    featured_listings = Listing.objects.filter(
-        status='active'
-    ).order_by('-created_at')[:4]
-    print(featured_listings)
-    # If we don't have 4 featured listings, fill with recent active listings
-    if featured_listings.count() < 4:
-        remaining_count = 4 - featured_listings.count()
-        recent_listings = Listing.objects.filter(
-            status='active'
-        ).exclude(
-            id__in=featured_listings.values_list('id', flat=True)
-        ).order_by('-created_at')[:remaining_count]
-        listings = list(featured_listings) + list(recent_listings)
-    else:
-        listings = featured_listings
-    
+def get_home_content():
+    """Load everything the home page needs from the database in one pass"""
+    # Latest 4 active listings, as card rows
+    listings = get_cards(
+        Listing.objects.filter(status='active').order_by('-created_at'), limit=4
+    )
+
     # Get the first active agent profile
     agent_profile = AgentProfile.objects.filter(is_active=True).first()
-    
+
     # Get section content for the home page
     section_content = {
         'agent': SectionContent.objects.filter(section='about', is_active=True).first()
     }
-    
+
+    # Get featured reviews
+    featured_reviews = list(Review.objects.filter(
+        is_approved=True,
+        featured=True
+    ).order_by('-created_at')[:4])
+
+    # Get review statistics
+    stats = ReviewStats.get_solo()
+    review_stats = {
+        'avg_rating': stats.avg_rating,
+        'total_reviews': stats.approved_count,
+    }
+
+    return {
+        'listings': listings,
+        'agent_profile': agent_profile,
+        'section_content': section_content,
+        'featured_reviews': featured_reviews,
+        'review_stats': review_stats,
+    }
+
+
+def home(request):
+    """Home page view with featured listings and reviews"""
+    # Database content is cached until a listing, image, agent, section or
+    # review changes (see listings/signals.py)
+    context = dict(get_or_build(
+        HOME_CONTENT, 'context', get_home_content,
+        timeout=settings.HOME_CACHE_TIMEOUT,
+    ))
+
     # PDF Files information
-    pdf_files = [
+    context['pdf_files'] = [
         {
             'name': 'TREC License Information',
             'static_path': 'listings/pdfs/CN 1-5.pdf',
@@ -75,29 +103,9 @@ def home(request):
             'size': '180 KB',
         }
     ]
-    
-    # Get featured reviews
-    featured_reviews = Review.objects.filter(
-        is_approved=True, 
-        featured=True
-    ).order_by('-created_at')[:4]
-    
-    # Get review statistics
-    review_stats = Review.objects.filter(is_approved=True).aggregate(
-        avg_rating=Avg('rating'),
-        total_reviews=Count('id')
-    )
-
-    context = {
-        'listings': featured_listings,
-        'agent_profile': agent_profile,
-        'section_content': section_content,
-        'pdf_files': pdf_files,
-        'featured_reviews': featured_reviews,
-        'review_stats': review_stats,
+    context['content_version'] = get_content_version(HOME_CONTENT)
+    context['cache_timeout'] = settings.HOME_CACHE_TIMEOUT
 
-    }
-    print(featured_listings)
     return render(request, 'listings/info.html', context)
 
 
@@ -239,199 +247,229 @@ def contact_view(request):
 
 
 # ============ SEARCH VIEW ============
+def filter_listings(form):
+    """
+    Active listings matching a bound ListingSearchForm. Returns
+    (queryset, ranked, geo): the lazily filtered queryset, whether it is in
+    relevance order, and geo_search() arguments for geo searches (or None).
+    """
+    qs = Listing.objects.filter(status='active').order_by('-created_at')
+    ranked = False
+    
+    if not form.is_valid():
+        return qs, ranked, None
+    
+    q = form.cleaned_data.get('q')
+    if q:
+        # Ranked full-text search on PostgreSQL, icontains elsewhere
+        qs = search_listings(qs, q)
+        ranked = full_text_search_available()
+    
+    min_price = form.cleaned_data.get('min_price')
+    if min_price:
+        qs = qs.filter(price__gte=min_price)
+    
+    max_price = form.cleaned_data.get('max_price')
+    if max_price:
+        qs = qs.filter(price__lte=max_price)
+    
+    city = form.cleaned_data.get('city')
+    if city:
+        qs = qs.filter(city__icontains=city)
+    
+    beds = form.cleaned_data.get('beds')
+    if beds:
+        qs = qs.filter(beds__gte=beds)
+    
+    geo = None
+    if form.has_geo_filter():
+        radius_mi = form.cleaned_data.get('radius_mi')
+        geo = {
+            'lat': form.cleaned_data.get('lat'),
+            'lng': form.cleaned_data.get('lng'),
+            'radius_km': radius_mi / KM_TO_MILES if radius_mi is not None else None,
+            'bbox': form.cleaned_data.get('bbox'),
+            'sort_by_distance': form.cleaned_data.get('sort') == 'distance',
+        }
+    
+    return qs, ranked, geo
+
+
+def get_search_results(form, qs, geo):
+    """Ordered results for a search, from the result cache when it's a repeat"""
+    cleaned_data = form.cleaned_data if form.is_valid() else {}
+    return cached_search_results(qs, search_signature(cleaned_data), geo)
+
+
+def get_search_facets(form, qs, geo, results):
+    """City/beds/baths/price counts for the filtered results (cached)"""
+    cleaned_data = form.cleaned_data if form.is_valid() else {}
+    if geo is not None:
+        qs = Listing.objects.filter(pk__in=results.ids)
+    return get_facets(search_signature(cleaned_data, exclude=('sort',)), qs)
+
+
 def search(request):
     """Search listings with filters"""
     form = ListingSearchForm(request.GET)
-    qs = Listing.objects.filter(status='active')
+    qs, ranked, geo = filter_listings(form)
+    results = None
+
+    # ?cursor= opts in to keyset pagination; relevance-ranked and geo
+    # results have no (created_at, id) order to page through, so they
+    # keep pages (served from the result cache)
+    if 'cursor' in request.GET and not ranked and geo is None:
+        listings_page = CursorPaginator(card_model_queryset(qs), 12).get_page(request.GET['cursor'])
+        listings_page.object_list = [
+            ListingCard.from_instance(listing) for listing in listings_page
+        ]
+    else:
+        results = get_search_results(form, qs, geo)
+        paginator = Paginator(results, 12)
+        page = request.GET.get('page', 1)
+        listings_page = paginator.get_page(page)
     
-    if form.is_valid():
-        q = form.cleaned_data.get('q')
-        if q:
-            qs = qs.filter(
-                Q(title__icontains=q) | 
-                Q(description__icontains=q) | 
-                Q(address__icontains=q)
-            )
-        
-        min_price = form.cleaned_data.get('min_price')
-        if min_price:
-            qs = qs.filter(price__gte=min_price)
-        
-        max_price = form.cleaned_data.get('max_price')
-        if max_price:
-            qs = qs.filter(price__lte=max_price)
-        
-        city = form.cleaned_data.get('city')
-        if city:
-            qs = qs.filter(city__icontains=city)
-        
-        beds = form.cleaned_data.get('beds')
-        if beds:
-            qs = qs.filter(beds__gte=beds)
-
-    paginator = Paginator(qs.order_by('-created_at'), 12)
-    page = request.GET.get('page', 1)
-    listings_page = paginator.get_page(page)
+    # The current filters, for the pagination links
+    params = request.GET.copy()
+    params.pop('page', None)
+    params.pop('cursor', None)
     
-    return render(request, 'listings/home.html', {
+    return render(request, 'listings/search_results.html', {
         'listings': listings_page, 
-        'form': form
+        'form': form,
+        'query_string': params.urlencode(),
+        'cursor_pagination': isinstance(listings_page, CursorPage),
+        'facets': get_search_facets(form, qs, geo, results),
     })
 
 
-# ============ PROPERTY LIST VIEW ============
-def property_list(request):
-    """Display property list from JSON file"""
-    # Get the path to the JSON file inside your app
-    json_path = os.path.join(os.path.dirname(__file__), 'properties.json')
-
-    # Load the data
-    with open(json_path, 'r') as file:
-        properties = json.load(file)
+def search_api(request):
+    """JSON version of search(), including radius/box geo search"""
+    form = ListingSearchForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+    qs, _, geo = filter_listings(form)
+    results = get_search_results(form, qs, geo)
 
-    # Send data to the template
-    return render(request, 'listings/property_list.html', {'properties': properties})
+    try:
+        per_page = min(max(int(request.GET.get('per_page', 12)), 1), 100)
+    except ValueError:
+        per_page = 12
+    page = Paginator(results, per_page).get_page(request.GET.get('page', 1))
+
+    listings = []
+    for listing in page:
+        item = {
+            'id': listing.id,
+            'title': listing.title,
+            'price': str(listing.price),
+            'address': listing.address,
+            'city': listing.city,
+            'state': listing.state,
+            'zip_code': listing.zip_code,
+            'beds': listing.beds,
+            'baths': str(listing.baths),
+            'sq_ft': listing.sq_ft,
+            'latitude': listing.latitude,
+            'longitude': listing.longitude,
+            'image': listing.get_first_image(),
+        }
+        if listing.headline_html is not None:
+            # Escaped description snippet with <mark> around the matches
+            item['headline'] = str(listing.headline_html)
+        if listing.distance_mi is not None:
+            item['distance_mi'] = listing.distance_mi
+            item['distance_km'] = listing.distance_km
+        listings.append(item)
 
+    return JsonResponse({
+        'success': True,
+        'results': listings,
+        'count': page.paginator.count,
+        'current_page': page.number,
+        'total_pages': page.paginator.num_pages,
+        'has_next': page.has_next(),
+        'facets': get_search_facets(form, qs, geo, results),
+    })
 
-# ============ UTILITY FUNCTIONS ============
-def calculate_distance(lat1, lng1, lat2, lng2):
-    """Calculate distance between two coordinates using Haversine formula"""
-    R = 6371  # Earth's radius in kilometers
-    
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    delta_lat = math.radians(lat2 - lat1)
-    delta_lng = math.radians(lng2 - lng1)
-    
-    a = (math.sin(delta_lat/2) * math.sin(delta_lat/2) + 
-         math.cos(lat1_rad) * math.cos(lat2_rad) * 
-         math.sin(delta_lng/2) * math.sin(delta_lng/2))
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    
-    return R * c  # Distance in kilometers
 
+def listing_clusters(request):
+    """Grid clusters of active listings for the map viewport (?bbox=&zoom=)"""
+    form = MapClusterForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
 
-def get_coordinates(address):
-    """Get coordinates from address with better error handling"""
+    zoom = form.cleaned_data['zoom']
     try:
-        url = "https://maps.googleapis.com/maps/api/geocode/json"
-        params = {
-            "address": address,
-            "key": settings.GOOGLE_MAPS_API_KEY
-        }
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-        
-        print(f"Geocoding API response: {data['status']}")
-        
-        if data['status'] == 'OK' and data['results']:
-            loc = data['results'][0]['geometry']['location']
-            return loc['lat'], loc['lng']
-        else:
-            print(f"Geocoding error: {data.get('error_message', 'Unknown error')}")
-            return None, None
-            
-    except Exception as e:
-        print(f"Geocoding exception: {e}")
-        return None, None
+        clusters = get_clusters(form.cleaned_data['bbox'], zoom)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'errors': {'bbox': [str(e)]}}, status=400)
 
+    return JsonResponse({
+        'success': True,
+        'zoom': zoom,
+        'clusters': clusters,
+        'total': sum(cluster['count'] for cluster in clusters),
+    })
 
-def get_nearby_places(lat, lng, place_type, keyword=None):
-    """Search nearby places with better error handling and ranking"""
-    try:
-        url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-        params = {
-            "location": f"{lat},{lng}",
-            "radius": 5000,  # 5km radius
-            "key": settings.GOOGLE_MAPS_API_KEY,
-            "type": place_type,
-        }
-        
-        if keyword:
-            params["keyword"] = keyword
-            
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-        
-        print(f"Places API response for {place_type}: {data['status']}")
-        
-        if data['status'] == 'OK':
-            places = data.get("results", [])
-            
-            # Calculate distance for each place and add it to the data
-            for place in places:
-                place_lat = place['geometry']['location']['lat']
-                place_lng = place['geometry']['location']['lng']
-                distance = calculate_distance(lat, lng, place_lat, place_lng)
-                place['distance_km'] = round(distance, 2)
-                place['distance_miles'] = round(distance * 0.621371, 2)  # Convert to miles
-                
-            return places
-        else:
-            print(f"Places API error: {data.get('error_message', 'Unknown error')}")
-            return []
-            
-    except Exception as e:
-        print(f"Places API exception: {e}")
-        return []
+
+# ============ PROPERTY LIST VIEW ============
+def property_list(request):
+    """Display property list from JSON file"""
+    properties = property_feed.all()
+
+    # Send data to the template
+    return render(request, 'listings/property_list.html', {'properties': properties})
 
 
 # ============ PROPERTY DETAIL VIEW ============
 def property_detail(request, pk):
     """Property detail view with improved nearby places functionality"""
-    # Load JSON data
-    json_path = os.path.join(os.path.dirname(__file__), 'properties.json')
-    with open(json_path, 'r') as file:
-        properties = json.load(file)
-
-    property_obj = next((p for p in properties if p['id'] == pk), None)
+    property_obj = property_feed.get(pk)
     if not property_obj:
         raise Http404("No Listing matches the given query.")
 
-    # Handle images
-    images = property_obj.get('images', [])
-    if isinstance(images, str):
-        try:
-            images = json.loads(images)
-        except:
-            images = [images]
-    
-    processed_images = []
-    for img in images:
-        if img.startswith('/'):
-            processed_images.append(img[1:])
-        else:
-            processed_images.append(img)
-    
-    property_obj['images'] = processed_images
+    # Upstream lookups share one deadline; whatever misses it renders empty
+    deadline = time.monotonic() + settings.PROPERTY_DETAIL_LOOKUP_DEADLINE
 
     # Get coordinates
     address = property_obj.get("address", "Killeen, TX")
-    lat, lng = get_coordinates(address)
+    lat, lng = call_with_timeout(
+        settings.PROPERTY_DETAIL_LOOKUP_DEADLINE, (None, None), get_coordinates, address
+    )
 
     # Get nearby places with proper sorting
     groceries = []
     schools = []
     
     if lat and lng:
-        # Get grocery stores sorted by distance (nearest first)
-        groceries = get_nearby_places(lat, lng, "grocery_store", "grocery")
-        groceries.sort(key=lambda x: x.get('distance_km', float('inf')))
-        
-        # Get schools sorted by rating (highest first), then by distance
-        schools = get_nearby_places(lat, lng, "school", "school")
-        schools.sort(key=lambda x: (
-            -x.get('rating', 0),  # Negative for descending rating
-            x.get('distance_km', float('inf'))  # Then by distance
-        ))
-        
+        poi_index = get_poi_index()
+        if poi_index is not None:
+            # Offline index: no network round trips at all
+            radius_km = SEARCH_RADIUS_M / 1000
+            nearby = {
+                'groceries': poi_index.query(lat, lng, 'grocery', radius_km=radius_km),
+                'schools': poi_index.query(lat, lng, 'school', radius_km=radius_km),
+            }
+        else:
+            nearby = get_nearby_places_concurrently(lat, lng, {
+                'groceries': ("grocery_store", "grocery"),
+                'schools': ("school", "school"),
+            }, timeout=deadline - time.monotonic())
+
+        # Grocery stores sorted by distance (nearest first)
+        groceries = rank_places(lat, lng, nearby['groceries'], limit=10)
+
+        # Schools sorted by rating (highest first), then by distance
+        schools = rank_places(lat, lng, nearby['schools'], by_rating=True, limit=10)
+
     else:
         print("Could not get coordinates for address")
     
     context = {
         "property": property_obj,
-        "groceries": groceries[:10],  # Limit to top 10
-        "schools": schools[:10],      # Limit to top 10
+        "groceries": groceries,
+        "schools": schools,
         "property_lat": lat or 31.1171,  # Default to Killeen coordinates
         "property_lng": lng or -97.7278,
         "GOOGLE_MAPS_API_KEY": getattr(settings, 'GOOGLE_MAPS_API_KEY', ''),
@@ -640,20 +678,33 @@ def admin_dashboard(request):
     user_count = User.objects.count()
     
     # Get property interest counts
-    total_interests = PropertyInterest.objects.count()
-    new_interests = PropertyInterest.objects.filter(status='new').count()
+    lead_stats = get_lead_stats()
     
     context = {
         'user_count': user_count,
-        'total_interests': total_interests,
-        'new_interests': new_interests,
+        'total_interests': lead_stats['total'],
+        'new_interests': lead_stats['new'],
         'property_count': 0,  # You can add your property count logic
-        'lead_count': total_interests,  # Using total interests as leads
+        'lead_count': lead_stats['total'],  # Using total interests as leads
     }
     
     return render(request, 'listings/admin_dashboard.html', context)
 
 
+@login_required
+@user_passes_test(is_admin)
+def google_api_status(request):
+    """Circuit breaker state of the shared Google API client, for monitoring"""
+    return JsonResponse(google_client.breaker.metrics())
+
+
+@login_required
+@user_passes_test(is_admin)
+def search_cache_status(request):
+    """Hit/miss counters of the search result cache, for monitoring"""
+    return JsonResponse(search_cache_stats())
+
+
 # ============ PROPERTY INTEREST VIEWS ============
 @login_required
 @user_passes_test(is_admin)
@@ -677,25 +728,26 @@ def interest_dashboard(request):
     if priority_filter != 'all':
         interests = interests.filter(priority=priority_filter)
     
-    # Get counts for stats
-    total_interests = PropertyInterest.objects.count()
-    new_interests = PropertyInterest.objects.filter(status='new').count()
-    contacted_interests = PropertyInterest.objects.filter(status='contacted').count()
-    buyers_count = PropertyInterest.objects.filter(interest_type='buyer').count()
-    sellers_count = PropertyInterest.objects.filter(interest_type='seller').count()
+    # Get counts for stats (one cached aggregate query)
+    lead_stats = get_lead_stats()
     
-    # Pagination
-    paginator = Paginator(interests, 20)  # 20 per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (?cursor= opts in to keyset pagination)
+    cursor_pagination = 'cursor' in request.GET
+    if cursor_pagination:
+        page_obj = CursorPaginator(interests, 20).get_page(request.GET['cursor'])
+    else:
+        paginator = Paginator(interests, 20)  # 20 per page
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
     
     context = {
         'interests': page_obj,
-        'total_interests': total_interests,
-        'new_interests': new_interests,
-        'contacted_interests': contacted_interests,
-        'buyers_count': buyers_count,
-        'sellers_count': sellers_count,
+        'cursor_pagination': cursor_pagination,
+        'total_interests': lead_stats['total'],
+        'new_interests': lead_stats['new'],
+        'contacted_interests': lead_stats['contacted'],
+        'buyers_count': lead_stats['buyers'],
+        'sellers_count': lead_stats['sellers'],
         'current_status': status_filter,
         'current_interest_type': interest_type_filter,
         'current_priority': priority_filter,
@@ -731,11 +783,8 @@ def interest_detail(request, interest_id):
         elif action == 'add_note':
             note = request.POST.get('note')
             if note:
-                if interest.notes:
-                    interest.notes += f"\n\n[{timezone.now().strftime('%Y-%m-%d %H:%M')}] {note}"
-                else:
-                    interest.notes = f"[{timezone.now().strftime('%Y-%m-%d %H:%M')}] {note}"
-                interest.save()
+                # One INSERT; the interest row itself is not rewritten
+                InterestNote.objects.create(interest=interest, author=request.user, body=note)
                 messages.success(request, 'Note added successfully')
                 
         elif action == 'assign_to':
@@ -756,6 +805,7 @@ def interest_detail(request, interest_id):
     
     context = {
         'interest': interest,
+        'notes': interest.notes.select_related('author'),
         'staff_users': staff_users,
     }
     
@@ -770,6 +820,7 @@ def delete_interest(request, interest_id):
     
     if request.method == 'POST':
         interest.delete()
+        invalidate_lead_stats()
         messages.success(request, 'Property interest deleted successfully')
         return redirect('listings:interest_dashboard')
     
@@ -790,27 +841,39 @@ def bulk_update_interests(request):
         
         interests = PropertyInterest.objects.filter(id__in=selected_ids)
         
-        if action == 'mark_contacted':
-            for interest in interests:
-                interest.mark_as_contacted()
-            messages.success(request, f'{len(interests)} interests marked as contacted')
-            
-        elif action == 'delete':
-            count = interests.count()
-            interests.delete()
-            messages.success(request, f'{count} interests deleted')
-            
-        elif action == 'update_status':
-            status = request.POST.get('bulk_status')
-            if status:
-                interests.update(status=status)
-                messages.success(request, f'{len(interests)} interests status updated')
+        # Each action is one set-based statement; counts come from its result
+        # rather than from loading the selected rows
+        with transaction.atomic():
+            if action == 'mark_contacted':
+                count = interests.update(status='contacted', contacted_date=timezone.now())
+                messages.success(request, f'{count} interests marked as contacted')
                 
-        elif action == 'update_priority':
-            priority = request.POST.get('bulk_priority')
-            if priority:
-                interests.update(priority=priority)
-                messages.success(request, f'{len(interests)} interests priority updated')
+            elif action == 'delete':
+                # No delete signals on leads or notes, so Django only reads the
+                # selected ids and deletes in batches, never row by row
+                _, deleted = interests.only('pk').delete()
+                count = deleted.get(PropertyInterest._meta.label, 0)
+                messages.success(request, f'{count} interests deleted')
+                
+            elif action == 'update_status':
+                status = request.POST.get('bulk_status')
+                if status in dict(PropertyInterest.STATUS_CHOICES):
+                    changes = {'status': status}
+                    if status == 'contacted':
+                        changes['contacted_date'] = timezone.now()
+                    count = interests.update(**changes)
+                    messages.success(request, f'{count} interests status updated')
+                    
+            elif action == 'update_priority':
+                priority = request.POST.get('bulk_priority')
+                if priority in dict(PropertyInterest.PRIORITY_CHOICES):
+                    count = interests.update(priority=priority)
+                    messages.success(request, f'{count} interests priority updated')
+            
+            # update() and deletes don't send the post_save that drops the
+            # cached counters
+            if action in ('mark_contacted', 'update_status', 'delete'):
+                transaction.on_commit(invalidate_lead_stats)
     
     return redirect('listings:interest_dashboard')
 
@@ -823,15 +886,7 @@ def interest_analytics(request):
         return redirect('listings:property_list')
     
     # Simple counts
-    interests = PropertyInterest.objects.all()
-    
-    context = {
-        'total': interests.count(),
-        'buyers': interests.filter(interest_type='buyer').count(),
-        'sellers': interests.filter(interest_type='seller').count(),
-        'new': interests.filter(status='new').count(),
-        'contacted': interests.filter(status='contacted').count(),
-    }
+    context = get_lead_stats()
     
     return render(request, 'listings/interest_analytics.html', context)
 
@@ -839,12 +894,13 @@ def interest_analytics(request):
 # ============ REVIEW VIEWS ============
 def review_stats(request):
     """Get review statistics for AJAX requests"""
-    stats = Review.objects.filter(is_approved=True).aggregate(
-        avg_rating=Avg('rating'),
-        total_reviews=Count('id'),
-        featured_reviews=Count('id', filter=Q(featured=True)),
-        five_star_reviews=Count('id', filter=Q(rating=5))
-    )
+    review_stats = ReviewStats.get_solo()
+    stats = {
+        'avg_rating': review_stats.avg_rating,
+        'total_reviews': review_stats.approved_count,
+        'featured_reviews': review_stats.featured_count,
+        'five_star_reviews': review_stats.five_star_count,
+    }
     
     # Calculate percentages
     if stats['total_reviews'] > 0:
@@ -857,33 +913,26 @@ def review_stats(request):
 
 def reviews_list(request):
     """Get reviews for AJAX requests"""
-    print("=== DEBUG: reviews_list called ===")
     category = request.GET.get('category', 'all')
     page = request.GET.get('page', 1)
-    
-    # Debug all reviews
-    all_reviews = Review.objects.all()
-    print(f"Total reviews in DB: {all_reviews.count()}")
-    print(f"Approved reviews: {all_reviews.filter(is_approved=True).count()}")
-    print(f"Featured reviews: {all_reviews.filter(featured=True).count()}")
+    stats = ReviewStats.get_solo()
     
     reviews = Review.objects.filter(is_approved=True)
-    print(f"Reviews after approval filter: {reviews.count()}")
     
     if category != 'all':
         reviews = reviews.filter(category=category)
-        print(f"Reviews after category filter ({category}): {reviews.count()}")
     
-    # Show first few reviews for debugging
-    for r in reviews[:5]:
-        print(f"Review: {r.id} - {r.name} - {r.rating} - Approved: {r.is_approved}")
-    
-    # Pagination
-    paginator = Paginator(reviews.order_by('-featured', '-created_at'), 8)
-    try:
-        page_obj = paginator.page(page)
-    except:
-        page_obj = paginator.page(1)
+    # Pagination (?cursor= opts in to keyset pagination)
+    cursor = request.GET.get('cursor')
+    if cursor is not None:
+        paginator = CursorPaginator(reviews, 8, ordering=('-featured', '-created_at', '-id'))
+        page_obj = paginator.get_page(cursor)
+    else:
+        paginator = Paginator(reviews.order_by('-featured', '-created_at'), 8)
+        try:
+            page_obj = paginator.page(page)
+        except:
+            page_obj = paginator.page(1)
     
     reviews_data = []
     for review in page_obj:
@@ -902,21 +951,25 @@ def reviews_list(request):
             'helpful_count': review.helpful_count,
         })
     
+    total_reviews = stats.get_category_count(category)
     response_data = {
         'reviews': reviews_data,
         'has_next': page_obj.has_next(),
         'has_previous': page_obj.has_previous(),
-        'current_page': page_obj.number,
-        'total_pages': paginator.num_pages,
-        'total_reviews': reviews.count(),
+        'total_reviews': total_reviews,
         'debug': {
-            'total_in_db': Review.objects.count(),
-            'approved_count': Review.objects.filter(is_approved=True).count(),
+            'total_in_db': stats.total_count,
+            'approved_count': stats.approved_count,
             'request_category': category,
         }
     }
+    if cursor is not None:
+        response_data['next_cursor'] = page_obj.next_cursor
+        response_data['previous_cursor'] = page_obj.previous_cursor
+    else:
+        response_data['current_page'] = page_obj.number
+        response_data['total_pages'] = paginator.num_pages
     
-    print(f"=== DEBUG: Returning {len(reviews_data)} reviews ===")
     return JsonResponse(response_data)
     """Get reviews for AJAX requests"""
     category = request.GET.get('category', 'all')
@@ -1168,12 +1221,13 @@ def admin_review_dashboard(request):
     reviews = Review.objects.all().order_by('-created_at')
     
     # Statistics
+    review_stats = ReviewStats.get_solo()
     stats = {
-        'total': reviews.count(),
-        'approved': reviews.filter(is_approved=True).count(),
-        'pending': reviews.filter(is_approved=False).count(),
-        'featured': reviews.filter(featured=True).count(),
-        'avg_rating': reviews.filter(is_approved=True).aggregate(Avg('rating'))['rating__avg'] or 0,
+        'total': review_stats.total_count,
+        'approved': review_stats.approved_count,
+        'pending': review_stats.pending_count,
+        'featured': review_stats.featured_total_count,
+        'avg_rating': review_stats.avg_rating or 0,
     }
     
     context = {